@@ -0,0 +1,358 @@
+"""
+Microbenchmarks for the input injection and listener hook hot paths.
+
+Runs against a recording SendInput stand-in, so it works on any OS:
+
+    python benchmark.py
+"""
+
+import ctypes
+import os
+import tempfile
+import time
+import tracemalloc
+
+import input_control
+import recording
+from hotkeys import on_key_press, on_mouse_move
+from recording_format import read_binary, write_binary
+from recording_store import KEY_PRESS, MOUSE_MOVE, TYPE_CODES, Recording
+from input_control import (
+    Input,
+    Input_I,
+    KeyBdInput,
+    RecordingSendInput,
+    Win32Backend,
+    set_send_input,
+    set_backend,
+    VK_SHIFT,
+    VK_TAB,
+    VK_E,
+    pooled_key,
+)
+
+ROUNDS = 20000
+RECORDING_EVENTS = 100000
+
+
+def _report(name, elapsed, rounds, extra=""):
+    per_event = elapsed / rounds * 1e6
+    print(f"{name:<32} {per_event:8.2f} us/group {extra}")
+
+
+def bench_single_vs_batch(rounds=ROUNDS):
+    """One SendInput per event vs. one SendInput per same-timestamp group"""
+    vks = [VK_SHIFT, VK_TAB, VK_E]
+    backend = Win32Backend()
+    # Chord as playback sends it: presses in order, releases in reverse
+    group = backend.prepare_group(
+        [("key_press", f"vk:{vk}", None, None) for vk in vks]
+        + [("key_release", f"vk:{vk}", None, None) for vk in reversed(vks)]
+    )
+
+    recorder = RecordingSendInput()
+    previous = set_send_input(recorder)
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for vk in vks:
+                backend.send_key(vk)
+            for vk in reversed(vks):
+                backend.send_key(vk, up=True)
+        single = time.perf_counter() - start
+        single_calls = len(recorder.calls)
+        single_gap = _mean_group_spread(recorder.calls, len(vks) * 2)
+
+        recorder.calls.clear()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            backend.send_group(group)
+        batched = time.perf_counter() - start
+        batched_calls = len(recorder.calls)
+    finally:
+        set_send_input(previous)
+
+    _report(
+        "single SendInput per event",
+        single,
+        rounds,
+        f"({single_calls} calls, {single_gap * 1e6:.2f} us spread/group)",
+    )
+    _report(
+        "batched SendInput per group",
+        batched,
+        rounds,
+        f"({batched_calls} calls, 0.00 us spread/group)",
+    )
+
+
+def _mean_group_spread(calls, group_size):
+    """Average time between the first and last call of each event group"""
+    spreads = [
+        calls[i + group_size - 1][0] - calls[i][0]
+        for i in range(0, len(calls) - group_size + 1, group_size)
+    ]
+    return sum(spreads) / len(spreads) if spreads else 0.0
+
+
+def _fake_send_input(count, inputs, size):
+    return count
+
+
+def _legacy_key_event(vk, up):
+    """Per-event construction as the macros did it before the pool existed"""
+    extra = ctypes.c_ulong(0)
+    ii_ = Input_I()
+    ii_.ki = KeyBdInput(vk, 0, 0x0002 if up else 0, 0, ctypes.pointer(extra))
+    record = ctypes.pointer(Input(ctypes.c_ulong(1), ii_))
+    _fake_send_input(1, record, ctypes.sizeof(Input))
+    return record
+
+
+def _pooled_key_event(vk, up):
+    record = pooled_key(vk, up)
+    _fake_send_input(1, record, input_control.INPUT_SIZE)
+    return record
+
+
+def _bytes_per_event(make_event, rounds):
+    """Memory held by the objects one event allocates (kept alive to measure them)"""
+    keep = [None] * rounds
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(rounds):
+        keep[i] = make_event(VK_E, i & 1)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / rounds
+
+
+def bench_pool(rounds=ROUNDS):
+    """Fresh ctypes objects per event vs. pooled prebuilt records"""
+    for name, make_event in (
+        ("fresh Input per event", _legacy_key_event),
+        ("pooled Input per event", _pooled_key_event),
+    ):
+        start = time.perf_counter()
+        for i in range(rounds):
+            make_event(VK_E, i & 1)
+        elapsed = time.perf_counter() - start
+        allocated = _bytes_per_event(make_event, rounds)
+        print(
+            f"{name:<32} {elapsed / rounds * 1e6:8.2f} us/event "
+            f"({allocated:.0f} bytes allocated/event)"
+        )
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+def _factory(func):
+    """One create_*_wrapper() call: a fresh closure every time"""
+
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _legacy_listener_callbacks(state):
+    """Hooks as main.py built them before: every event runs the wrapper factories"""
+
+    def on_press(key):
+        on_key_press(
+            key,
+            state,
+            _factory(_noop),
+            _factory(_noop),
+            _factory(_noop),
+            _factory(_noop),
+            _factory(_noop),
+            _factory(_noop),
+            _factory(_noop),
+        )
+
+    def on_move(x, y):
+        on_mouse_move(x, y, state, _factory(_noop))
+
+    return on_press, on_move
+
+
+def _bound_listener_callbacks(state):
+    """Hooks as main.py builds them now: callbacks bound once at startup"""
+    run_macro = run_throw = run_throw_v2 = _factory(_noop)
+    start = stop = playback = record = _factory(_noop)
+
+    def on_press(key):
+        on_key_press(
+            key,
+            state,
+            run_macro,
+            run_throw,
+            run_throw_v2,
+            start,
+            stop,
+            playback,
+            record,
+        )
+
+    def on_move(x, y):
+        on_mouse_move(x, y, state, record)
+
+    return on_press, on_move
+
+
+def _transient_bytes(event, rounds):
+    """Average peak memory one event allocates and frees again"""
+    total = 0
+    tracemalloc.start()
+    for _ in range(rounds):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        event()
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total / rounds
+
+
+def bench_listener_callbacks(rounds=ROUNDS):
+    """Per-event cost of the keyboard/mouse hook callbacks for a non-trigger key"""
+    state = {"is_recording": False, "config": {"macro_enabled": True}}
+    for name, make_callbacks in (
+        ("factory per event", _legacy_listener_callbacks),
+        ("bound once", _bound_listener_callbacks),
+    ):
+        on_press, on_move = make_callbacks(state)
+        for hook, event in (
+            ("key press", lambda: on_press("x")),
+            ("mouse move", lambda: on_move(10, 20)),
+        ):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                event()
+            elapsed = time.perf_counter() - start
+            allocated = _transient_bytes(event, rounds // 10)
+            print(
+                f"{hook + ', ' + name:<32} {elapsed / rounds * 1e6:8.2f} us/event "
+                f"({allocated:.0f} bytes allocated/event)"
+            )
+
+
+def _synthetic_events(count):
+    """(time, type, key, x, y): mostly mouse moves with a key tap every 10 events"""
+    for i in range(count):
+        at = i * 0.002
+        if i % 10 == 0:
+            yield at, "key_press", "char:e", None, None
+        elif i % 10 == 1:
+            yield at, "key_release", "char:e", None, None
+        else:
+            yield at, "mouse_move", None, i % 1920, 540
+
+
+def _build_dicts(count):
+    """How load_recording used to hold a recording"""
+    actions = []
+    for at, action_type, key_str, x, y in _synthetic_events(count):
+        action = {"time": at, "type": action_type}
+        if key_str:
+            action["key"] = recording.string_to_key(key_str)
+        if x is not None:
+            action["x"] = x
+            action["y"] = y
+        actions.append(action)
+    return actions
+
+
+def _build_recording(count):
+    built = Recording()
+    for at, action_type, key_str, x, y in _synthetic_events(count):
+        built.append(at, TYPE_CODES[action_type], key_str, x, y)
+    return built
+
+
+def _walk_dicts(actions):
+    """The per-event work playback does, minus the injection"""
+    moves = 0
+    for action in actions:
+        action_type = action["type"]
+        if action_type == "key_press":
+            action.get("key")
+        elif action_type == "mouse_move":
+            action.get("x"), action.get("y")
+            moves += 1
+    return moves
+
+
+def _walk_recording(built):
+    moves = 0
+    for type_code, code, x, y in zip(built.types, built.codes, built.xs, built.ys):
+        if type_code == KEY_PRESS:
+            code
+        elif type_code == MOUSE_MOVE:
+            x, y
+            moves += 1
+    return moves
+
+
+def bench_recording_container(count=RECORDING_EVENTS):
+    """Memory and iteration cost of list-of-dicts vs. the array-backed Recording"""
+    for name, build, walk in (
+        ("list of dicts", _build_dicts, _walk_dicts),
+        ("Recording (arrays)", _build_recording, _walk_recording),
+    ):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        built = build(count)
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        walk(built)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<32} {elapsed / count * 1e6:8.3f} us/event iterated "
+            f"({held / count:.1f} bytes/event held)"
+        )
+
+
+def bench_recording_files(count=RECORDING_EVENTS):
+    """Load time and size on disk of the same recording as CSV and as .mrec"""
+    built = _build_recording(count)
+    with tempfile.TemporaryDirectory() as folder:
+        csv_file = os.path.join(folder, "bench.csv")
+        binary_file = os.path.join(folder, "bench.mrec")
+        recording.write_recording_csv(built, csv_file)
+        write_binary(built, binary_file)
+        for name, filename, read in (
+            ("CSV", csv_file, recording.read_recording_csv),
+            ("binary .mrec", binary_file, read_binary),
+        ):
+            start = time.perf_counter()
+            read(filename)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{'load ' + name:<32} {elapsed * 1000:8.1f} ms "
+                f"({os.path.getsize(filename) / count:.1f} bytes/event on disk)"
+            )
+
+
+def main():
+    print(f">> BENCHMARK: input_control ({input_control.INPUT_SIZE}-byte INPUT)")
+    # Measure the SendInput path even where another backend is the default
+    previous = set_backend(Win32Backend())
+    try:
+        bench_single_vs_batch()
+        bench_pool()
+    finally:
+        set_backend(previous)
+    print(">> BENCHMARK: listener callbacks")
+    bench_listener_callbacks()
+    print(f">> BENCHMARK: recording container ({RECORDING_EVENTS} events)")
+    bench_recording_container()
+    bench_recording_files()
+
+
+if __name__ == "__main__":
+    main()
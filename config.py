@@ -1,10 +1,14 @@
+import copy
 import json
 import os
 
 CONFIG_FILE = "macro_config.json"
 DEFAULT_CONFIG = {
     "click_cps": 18,
+    "click_duty_cycle": 0.5,
+    "spam_catch_up": "skip",
     "key_macro_trigger": "Key.f3",
+    "hotkey_sequence_timeout": 1.0,
     "net_interface": "WiFi",
     "net_interface_type": "WiFi",
     "network_method": "Clumsy",
@@ -51,6 +55,32 @@ DEFAULT_CONFIG = {
     "throw_e_period": 0.0219,
     "throw_drag_time": 0.5,
     "throw_drag_left_pixels": -2000,
+    "input_backend": "auto",
+    "telemetry_enabled": True,
+    "hook_queue_size": 4096,
+    "hook_budget_ms": 1.0,
+    "recording_flush_interval": 0.5,
+    "recording_flush_rows": 256,
+    "mouse_sample_tolerance_px": 2.0,
+    "mouse_sample_max_rate": 125.0,
+    "mouse_sample_max_gap_ms": 50.0,
+    "playback_group_window_ms": 1.0,
+    "path_simplify_mode": "off",
+    "path_simplify_px": 2.0,
+    "path_simplify_max_gap_ms": 100.0,
+    "retrigger_policies": {
+        "macro": "ignore",
+        "throw": "ignore",
+        "throw_v2": "ignore",
+        "playback": "ignore",
+    },
+    "trigger_min_interval": {
+        "macro": 0.25,
+        "throw": 0.25,
+        "throw_v2": 0.25,
+        "record": 0.25,
+        "playback": 0.25,
+    },
 }
 
 state = {
@@ -58,15 +88,35 @@ state = {
     "is_running_macro": False,
     "wifi_profile": None,
     "overlay_ref": None,
-    "config": DEFAULT_CONFIG.copy(),
+    "config": copy.deepcopy(DEFAULT_CONFIG),
     "is_recording": False,
     "recorded_actions": [],
     "recording_start_time": None,
     "current_recording_file": None,
+    "recording_writer": None,
+    "mouse_sampler": None,
     "last_recording_file": None,
+    "last_playback_lateness": None,
     "config_last_modified": 0,
+    "hook_consumer": None,
 }
 
+# Callbacks run with the new config after every load or save
+config_listeners = []
+
+
+def add_config_listener(callback):
+    """Register callback(config) to run whenever the config is loaded or saved"""
+    config_listeners.append(callback)
+
+
+def notify_config_listeners():
+    for callback in config_listeners:
+        try:
+            callback(state["config"])
+        except Exception as e:
+            print(f"!! ERROR in config listener: {e}")
+
 
 def load_config():
     if os.path.exists(CONFIG_FILE):
@@ -75,19 +125,21 @@ def load_config():
                 loaded = json.load(f)
             for k in DEFAULT_CONFIG:
                 if k not in loaded:
-                    loaded[k] = DEFAULT_CONFIG[k]
+                    loaded[k] = copy.deepcopy(DEFAULT_CONFIG[k])
             state["config"] = loaded
             state["config_last_modified"] = os.path.getmtime(CONFIG_FILE)
         except Exception:
-            state["config"] = DEFAULT_CONFIG.copy()
+            state["config"] = copy.deepcopy(DEFAULT_CONFIG)
     else:
-        state["config"] = DEFAULT_CONFIG.copy()
+        state["config"] = copy.deepcopy(DEFAULT_CONFIG)
+    notify_config_listeners()
 
 
 def save_config():
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         json.dump(state["config"], f, indent=2)
     state["config_last_modified"] = os.path.getmtime(CONFIG_FILE)
+    notify_config_listeners()
 
 
 def check_config_reload():
@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+import telemetry
+from timing import CancelToken, MacroCancelled, set_cancel_token
+
+RETRIGGER_POLICIES = ("ignore", "queue", "restart")
+MAX_QUEUED_PER_MACRO = 3
+
+
+class MacroJob:
+    """One queued macro run"""
+
+    __slots__ = ("name", "func", "token", "submitted", "triggered")
+
+    def __init__(self, name, func, triggered=None):
+        self.name = name
+        self.func = func
+        self.token = CancelToken()
+        self.submitted = time.perf_counter()
+        # Hook time of the trigger key, for the trigger-to-input latency
+        self.triggered = triggered
+
+
+class MacroLane:
+    """Queued jobs and the running one of one macro name, with its worker thread"""
+
+    __slots__ = ("name", "pending", "current", "wakeup", "thread")
+
+    def __init__(self, name, lock):
+        self.name = name
+        self.pending = deque()
+        self.current = None
+        self.wakeup = threading.Condition(lock)
+        self.thread = None
+
+    def jobs(self):
+        return list(self.pending) + ([self.current] if self.current else [])
+
+
+class MacroExecutor:
+    """
+    Long-lived worker threads, one per macro name, that run its jobs one at
+    a time from a queue. Different macros run side by side (a throw does not
+    wait for a running timeline macro), as with the old thread per trigger.
+    What a trigger does while its macro is running or queued depends on its
+    policy: "ignore" drops it, "queue" runs it afterwards, "restart" cancels
+    the running/queued run and starts over.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lanes = {}
+        self._ready = threading.Event()
+        self._ready.set()
+
+    def warm_up(self, warmups):
+        """Run warm-up callables on their own thread; jobs start once they are done"""
+        if not warmups:
+            self._ready.set()
+            return
+        self._ready.clear()
+        threading.Thread(
+            target=self._run_warmups, args=(warmups,), name="macro-warmup", daemon=True
+        ).start()
+
+    def _run_warmups(self, warmups):
+        for warmup in warmups:
+            try:
+                warmup()
+            except Exception as e:
+                print(f"!! ERROR in macro warm-up: {e}")
+        self._ready.set()
+
+    def _lane(self, name):
+        """Lane of name, its worker is started on first use (call with the lock held)"""
+        lane = self._lanes.get(name)
+        if lane is None:
+            lane = self._lanes[name] = MacroLane(name, self._lock)
+            lane.thread = threading.Thread(
+                target=self._worker, args=(lane,), name=f"macro-{name}", daemon=True
+            )
+            lane.thread.start()
+        return lane
+
+    def submit(self, name, func, policy="ignore", triggered=None):
+        """Queue func under name according to policy, returns the job or None"""
+        if policy not in RETRIGGER_POLICIES:
+            print(f"!! ERROR: Unknown retrigger policy '{policy}', using ignore")
+            policy = "ignore"
+
+        with self._lock:
+            lane = self._lane(name)
+            running = lane.current
+            queued = list(lane.pending)
+
+            if policy == "ignore" and (running or queued):
+                return None
+            if policy == "queue" and len(queued) >= MAX_QUEUED_PER_MACRO:
+                return None
+            if policy == "restart":
+                for job in queued:
+                    job.token.cancel()
+                lane.pending.clear()
+                if running:
+                    print(f">> MACRO: Restarting {name}")
+                    running.token.cancel()
+
+            job = MacroJob(name, func, triggered)
+            lane.pending.append(job)
+            lane.wakeup.notify()
+            return job
+
+    def cancel_all(self):
+        """Cancel every running job and drop everything queued"""
+        with self._lock:
+            for lane in self._lanes.values():
+                for job in lane.jobs():
+                    job.token.cancel()
+                lane.pending.clear()
+
+    def is_busy(self, name=None):
+        with self._lock:
+            lanes = list(self._lanes.values())
+            return any(
+                lane.jobs() for lane in lanes if name is None or lane.name == name
+            )
+
+    def _worker(self, lane):
+        while True:
+            with self._lock:
+                while not lane.pending:
+                    lane.wakeup.wait()
+                job = lane.pending.popleft()
+                lane.current = job
+
+            # Calibration and plan warm-up finish before the first macro runs
+            self._ready.wait()
+            set_cancel_token(job.token)
+            telemetry.arm_trigger(job.name, job.triggered)
+            try:
+                if not job.token.cancelled():
+                    job.func()
+            except MacroCancelled:
+                print(f">> MACRO: {job.name} cancelled")
+            except Exception as e:
+                print(f"!! ERROR in macro {job.name}: {e}")
+            finally:
+                set_cancel_token(None)
+                telemetry.arm_trigger(None, None)
+                with self._lock:
+                    lane.current = None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The process-wide macro executor, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = MacroExecutor()
+    return _executor
+
+
+def start_executor(*warmups):
+    """Start the executor at startup, warm-up callables run before any macro"""
+    executor = get_executor()
+    executor.warm_up(warmups)
+    return executor
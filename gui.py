@@ -4,6 +4,11 @@ import sys
 import os
 import re
 from settings_window import SettingsWindow
+from hotkeys import parse_binding
+import telemetry
+from telemetry import export_telemetry, print_phase_summary
+from recording import get_recording_catalog, select_recording
+from recording_catalog import entry_label
 
 # Modern Color Theme
 THEME = {
@@ -100,8 +105,17 @@ class Overlay(tk.Toplevel):
         )
         self.lbl_macro.pack(anchor="w")
 
+        self.lbl_lag = tk.Label(
+            container,
+            text="",
+            font=("Segoe UI", 8),
+            bg=THEME["bg_secondary"],
+            fg=THEME["text_dim"],
+        )
+        self.lbl_lag.pack(anchor="w")
+
         self.geometry(
-            f"160x60+{state['config']['overlay_x']}+{state['config']['overlay_y']}"
+            f"200x78+{state['config']['overlay_x']}+{state['config']['overlay_y']}"
         )
         self.bind("<Button-1>", self.start_move)
         self.bind("<B1-Motion>", self.do_move)
@@ -122,6 +136,18 @@ class Overlay(tk.Toplevel):
         self.save_config()
 
 
+def input_lag_text(state):
+    """Last trigger-to-input latency and hook budget overruns for the overlay"""
+    parts = []
+    if telemetry.last_latency:
+        macro, latency = telemetry.last_latency
+        parts.append(f"⚡ {macro} {latency * 1000:.1f} ms")
+    hooks = state.get("hook_consumer")
+    if hooks and hooks.overruns():
+        parts.append(f"{hooks.overruns()} slow hooks")
+    return " · ".join(parts)
+
+
 def update_overlay(state):
     """Update overlay text and visibility"""
     if not state["overlay_ref"] or not state["overlay_ref"].winfo_exists():
@@ -144,6 +170,7 @@ def update_overlay(state):
             text=macro_text,
             fg=THEME["text_dim"] if macro_text == "■ DISABLED" else THEME["accent"],
         )
+        ov.lbl_lag.config(text=input_lag_text(state))
     else:
         ov.withdraw()
 
@@ -156,6 +183,7 @@ class App(tk.Tk):
         self.state = state
         self.save_config_func = save_config
         self.get_active_network_interfaces = get_active_network_interfaces
+        self.latency_version = telemetry.latency_version
 
         self.title("Macro Controller")
         self.geometry("400x800")
@@ -265,6 +293,12 @@ class App(tk.Tk):
             [chr(i) for i in range(97, 123)]
             + [str(i) for i in range(10)]
             + [f"Key.f{i}" for i in range(1, 13)]
+            # Chords; the trigger boxes also accept typed sequences like "ctrl+k f3"
+            + [
+                f"{mods}+f{i}"
+                for mods in ("ctrl", "shift", "alt", "ctrl+shift")
+                for i in range(1, 13)
+            ]
         )
         clumsy_keys = [chr(i) for i in range(97, 123)] + [str(i) for i in range(10)]
 
@@ -316,6 +350,14 @@ class App(tk.Tk):
             cb.pack(fill="x", pady=(0, 8))
             return cb
 
+        def add_trigger_combobox(parent, default):
+            cb = add_combobox(parent, keys, default)
+            cb.config(state="normal")
+            cb.bind("<<ComboboxSelected>>", lambda e: self.save())
+            cb.bind("<Return>", lambda e: self.save())
+            cb.bind("<FocusOut>", lambda e: self.save())
+            return cb
+
         # Network Card
         net_card = create_card("Network Configuration", "🌐")
 
@@ -382,10 +424,9 @@ class App(tk.Tk):
         macro_card = create_card("Timeline Macro", "⚡")
 
         add_label(macro_card, "Trigger Key")
-        self.cb_trig = add_combobox(
-            macro_card, keys, self.state["config"]["key_macro_trigger"]
+        self.cb_trig = add_trigger_combobox(
+            macro_card, self.state["config"]["key_macro_trigger"]
         )
-        self.cb_trig.bind("<<ComboboxSelected>>", lambda e: self.save())
 
         add_label(macro_card, "Disconnect Timing")
         self.cb_disc_mode = add_combobox(
@@ -419,11 +460,10 @@ class App(tk.Tk):
         # Throw Macros Card
         throw_card = create_card("Throw Macros", "🎯")
 
-        add_label(throw_card, "Throw V1 Trigger (pynput)")
-        self.cb_throw_trig = add_combobox(
-            throw_card, keys, self.state["config"]["key_throw_trigger"]
+        add_label(throw_card, "Throw V1 Trigger (input backend)")
+        self.cb_throw_trig = add_trigger_combobox(
+            throw_card, self.state["config"]["key_throw_trigger"]
         )
-        self.cb_throw_trig.bind("<<ComboboxSelected>>", lambda e: self.save())
 
         tk.Label(
             throw_card,
@@ -435,10 +475,9 @@ class App(tk.Tk):
         ).pack(anchor="w", pady=(0, 8))
 
         add_label(throw_card, "Throw V2 Trigger (SendInput)")
-        self.cb_throw_v2_trig = add_combobox(
-            throw_card, keys, self.state["config"].get("key_throw_v2_trigger", "Key.f7")
+        self.cb_throw_v2_trig = add_trigger_combobox(
+            throw_card, self.state["config"].get("key_throw_v2_trigger", "Key.f7")
         )
-        self.cb_throw_v2_trig.bind("<<ComboboxSelected>>", lambda e: self.save())
 
         tk.Label(
             throw_card,
@@ -453,16 +492,14 @@ class App(tk.Tk):
         recording_card = create_card("Recording", "⏺")
 
         add_label(recording_card, "Record Trigger")
-        self.cb_record_trig = add_combobox(
-            recording_card, keys, self.state["config"]["key_record_trigger"]
+        self.cb_record_trig = add_trigger_combobox(
+            recording_card, self.state["config"]["key_record_trigger"]
         )
-        self.cb_record_trig.bind("<<ComboboxSelected>>", lambda e: self.save())
 
         add_label(recording_card, "Playback Trigger")
-        self.cb_playback_trig = add_combobox(
-            recording_card, keys, self.state["config"]["key_playback_trigger"]
+        self.cb_playback_trig = add_trigger_combobox(
+            recording_card, self.state["config"]["key_playback_trigger"]
         )
-        self.cb_playback_trig.bind("<<ComboboxSelected>>", lambda e: self.save())
 
         tk.Label(
             recording_card,
@@ -473,6 +510,34 @@ class App(tk.Tk):
             justify="left",
         ).pack(anchor="w")
 
+        add_label(recording_card, "Recordings (filter by name or key)")
+        self.recording_filter = tk.StringVar()
+        self.recording_filter.trace_add("write", lambda *_: self.refresh_recordings())
+        tk.Entry(
+            recording_card,
+            textvariable=self.recording_filter,
+            bg=THEME["bg_secondary"],
+            fg=THEME["text"],
+            insertbackground=THEME["text"],
+            font=THEME["font_mono"],
+            relief="flat",
+        ).pack(fill="x", pady=(0, 4))
+        self.lb_recordings = tk.Listbox(
+            recording_card,
+            height=5,
+            bg=THEME["bg_secondary"],
+            fg=THEME["text"],
+            selectbackground=THEME["accent"],
+            selectforeground=THEME["bg"],
+            font=THEME["font_mono"],
+            relief="flat",
+            activestyle="none",
+        )
+        self.lb_recordings.pack(fill="x", pady=(0, 4))
+        self.lb_recordings.bind("<<ListboxSelect>>", self.on_recording_selected)
+        self.recording_entries = []
+        self.refresh_recordings()
+
         # Control Card
         control_card = create_card("Controls", "🎮")
 
@@ -508,6 +573,12 @@ class App(tk.Tk):
         )
         self.btn_ov.pack(fill="x", pady=3)
 
+        ModernButton(
+            control_card,
+            text="⏱ Export Timing Stats",
+            command=self.export_timing,
+        ).pack(fill="x", pady=3)
+
         ModernButton(
             control_card,
             text="↻ Reload Application",
@@ -517,7 +588,7 @@ class App(tk.Tk):
 
     def save(self):
         c = self.state["config"]
-        c["key_macro_trigger"] = self.cb_trig.get()
+        self._save_trigger("key_macro_trigger", self.cb_trig)
         c["macro_disconnect_mode"] = self.cb_disc_mode.get()
         c["click_cps"] = self.s_cps.get()
         c["network_method"] = self.cb_net_method.get()
@@ -533,14 +604,71 @@ class App(tk.Tk):
                 c["net_interface"] = iface_selection
                 c["net_interface_type"] = "Unknown"
 
-        c["key_throw_trigger"] = self.cb_throw_trig.get()
-        c["key_throw_v2_trigger"] = self.cb_throw_v2_trig.get()
-        c["key_record_trigger"] = self.cb_record_trig.get()
-        c["key_playback_trigger"] = self.cb_playback_trig.get()
+        self._save_trigger("key_throw_trigger", self.cb_throw_trig)
+        self._save_trigger("key_throw_v2_trigger", self.cb_throw_v2_trig)
+        self._save_trigger("key_record_trigger", self.cb_record_trig)
+        self._save_trigger("key_playback_trigger", self.cb_playback_trig)
 
         self.save_config_func()
         # Settings auto-save on every change, so no popup needed
 
+    def _save_trigger(self, config_key, combobox):
+        """Store a typed/selected trigger binding, or revert the box if it is invalid"""
+        binding = " ".join(combobox.get().split())
+        try:
+            parse_binding(binding)
+        except ValueError as e:
+            print(f"!! ERROR: Invalid hotkey '{binding}': {e}")
+            combobox.set(self.state["config"].get(config_key, ""))
+            return
+        self.state["config"][config_key] = binding
+
+    def export_timing(self):
+        """Print per-phase p50/p95/p99 timing errors and append them to the JSONL file"""
+        print_phase_summary()
+        hooks = self.state.get("hook_consumer")
+        hook_stats = hooks.stats() if hooks else None
+        for name, stats in (hook_stats or {}).items():
+            print(f">> HOOKS: {name} {stats}")
+        export_telemetry(hook_stats=hook_stats)
+
+    def refresh_recordings(self):
+        """Fill the recordings list from the catalog (no recording is opened)"""
+        catalog = get_recording_catalog()
+        self.recordings_version = catalog.version
+        self.recording_entries = catalog.recordings(self.recording_filter.get())
+        current = os.path.basename(self.state.get("last_recording_file") or "")
+        self.lb_recordings.delete(0, "end")
+        for index, entry in enumerate(self.recording_entries):
+            self.lb_recordings.insert("end", entry_label(entry))
+            if entry["name"] == current:
+                self.lb_recordings.selection_set(index)
+
+    def sync_recordings(self):
+        """
+        Redraw the recordings list if the catalog changed since the last draw;
+        files added or removed outside the app are picked up by a rescan
+        """
+        catalog = get_recording_catalog()
+        catalog.refresh_if_changed()
+        if catalog.version != self.recordings_version:
+            self.refresh_recordings()
+
+    def sync_latency(self):
+        """Redraw the overlay if a macro measured a new trigger-to-input latency"""
+        if telemetry.latency_version != self.latency_version:
+            self.latency_version = telemetry.latency_version
+            update_overlay(self.state)
+
+    def on_recording_selected(self, event=None):
+        selection = self.lb_recordings.curselection()
+        if not selection or self.state["is_recording"]:
+            return
+        entry = self.recording_entries[selection[0]]
+        select_recording(
+            self.state, os.path.join(get_recording_catalog().folder, entry["name"])
+        )
+
     def refresh_interfaces(self):
         """Refresh the list of active network interfaces"""
         active_interfaces = self.get_active_network_interfaces()
@@ -0,0 +1,239 @@
+import threading
+import time
+from operator import itemgetter
+from config import add_config_listener
+
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_BUDGET_MS = 1.0
+IDLE_TIMEOUT = 0.5
+
+# Arguments the handlers take per pynput callback (without pynput 1.8's injected)
+KEY_ARITY = 1  # key
+MOVE_ARITY = 2  # x, y
+CLICK_ARITY = 4  # x, y, button, pressed
+
+perf_counter = time.perf_counter
+
+# Longest a handler may run on the consumer thread before it counts as an overrun (seconds)
+callback_budget = DEFAULT_BUDGET_MS / 1000
+
+
+def _apply_config(config):
+    global callback_budget
+    callback_budget = float(config.get("hook_budget_ms", DEFAULT_BUDGET_MS)) / 1000
+
+
+add_config_listener(_apply_config)
+
+
+class SPSCQueue:
+    """
+    Bounded single-producer/single-consumer ring for one hook thread.
+    The producer only writes the slots and then tail, the consumer only
+    writes head, so neither side takes a lock. When full, new events are
+    dropped and counted.
+    """
+
+    def __init__(self, name, size=DEFAULT_QUEUE_SIZE):
+        self.name = name
+        self.size = size
+        self._times = [0.0] * size
+        self._handlers = [None] * size
+        self._args = [None] * size
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.max_depth = 0
+        # Budget watchdog for this queue's handlers, written by the consumer only
+        self.handled = 0
+        self.overruns = 0
+        self.max_handler = 0.0
+        self.consumer = None
+
+    def depth(self):
+        return self.tail - self.head
+
+    def push(self, handler, args, at):
+        """Producer side: store one event seen at perf_counter time at, False if dropped"""
+        tail = self.tail
+        depth = tail - self.head
+        if depth >= self.size:
+            self.dropped += 1
+            return False
+        index = tail % self.size
+        self._times[index] = at
+        self._handlers[index] = handler
+        self._args[index] = args
+        self.tail = tail + 1
+        if depth >= self.max_depth:
+            self.max_depth = depth + 1
+        if self.consumer is not None and self.consumer.idle:
+            self.consumer.wake()
+        return True
+
+    def drain(self):
+        """Consumer side: take every queued (time, handler, args) event"""
+        head, tail = self.head, self.tail
+        size = self.size
+        events = []
+        for position in range(head, tail):
+            index = position % size
+            events.append(
+                (self._times[index], self._handlers[index], self._args[index])
+            )
+            self._handlers[index] = self._args[index] = None
+        self.head = tail
+        return events
+
+    def hook(self, handler, arity):
+        """
+        Listener callback that only queues handler(*args, at=time) for the
+        consumer. Only the first arity arguments are kept: pynput 1.8 passes
+        an extra injected flag to callbacks that take *args.
+        """
+        push = self.push
+
+        def callback(*args):
+            # Kein Rueckgabewert: False wuerde den pynput Listener stoppen
+            push(handler, args[:arity], perf_counter())
+
+        return callback
+
+
+class HookConsumer:
+    """
+    Consumer thread for the listener hooks: drains one SPSCQueue per hook
+    thread and runs the handlers (matching, recording, dispatch) in
+    timestamp order, off the hook threads.
+    """
+
+    def __init__(self, size=DEFAULT_QUEUE_SIZE):
+        self.size = size
+        self.queues = []
+        self.idle = False
+        self._wakeup = threading.Event()
+        self._reported_drops = 0
+        self._reported_overruns = 0
+        self._thread = threading.Thread(
+            target=self._run, name="hook-consumer", daemon=True
+        )
+        self._thread.start()
+
+    def add_queue(self, name):
+        """New queue for one producer thread (keyboard or mouse listener)"""
+        queue = SPSCQueue(name, self.size)
+        queue.consumer = self
+        self.queues.append(queue)
+        return queue
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stats(self):
+        """Queue depth, drops and handler budget overruns per hook thread"""
+        return {
+            queue.name: {
+                "depth": queue.depth(),
+                "max_depth": queue.max_depth,
+                "dropped": queue.dropped,
+                "handled": queue.handled,
+                "overruns": queue.overruns,
+                "max_overrun_ms": round(queue.max_handler * 1000, 3),
+            }
+            for queue in self.queues
+        }
+
+    def overruns(self):
+        return sum(queue.overruns for queue in self.queues)
+
+    def _drain(self):
+        """Queued events of every hook thread as (time, handler, args, queue)"""
+        events = []
+        for queue in self.queues:
+            events.extend(
+                (at, handler, args, queue) for at, handler, args in queue.drain()
+            )
+        if len(self.queues) > 1:
+            events.sort(key=itemgetter(0))
+        return events
+
+    def _run(self):
+        while True:
+            events = self._drain()
+            if not events:
+                # Erst idle melden, dann nochmal pruefen: kein Event geht verloren
+                self._wakeup.clear()
+                self.idle = True
+                events = self._drain()
+                if not events:
+                    self._wakeup.wait(IDLE_TIMEOUT)
+                self.idle = False
+                if not events:
+                    continue
+
+            for at, handler, args, queue in events:
+                started = perf_counter()
+                try:
+                    handler(*args, at=at)
+                except Exception as e:
+                    print(f"!! ERROR in hook handler: {e}")
+                # Watchdog: a slow handler delays every event queued behind it
+                elapsed = perf_counter() - started
+                queue.handled += 1
+                if elapsed > callback_budget:
+                    queue.overruns += 1
+                    if elapsed > queue.max_handler:
+                        queue.max_handler = elapsed
+            self._report_drops()
+            self._report_overruns()
+
+    def _report_overruns(self):
+        overruns = self.overruns()
+        if overruns > self._reported_overruns:
+            print(
+                f">> HOOKS: {overruns - self._reported_overruns} handlers over the "
+                f"{callback_budget * 1000:.2f} ms budget"
+            )
+            self._reported_overruns = overruns
+
+    def _report_drops(self):
+        dropped = sum(queue.dropped for queue in self.queues)
+        if dropped > self._reported_drops:
+            print(
+                f">> HOOKS: {dropped - self._reported_drops} input events dropped (queue full)"
+            )
+            self._reported_drops = dropped
+
+
+class DynamicListener:
+    """
+    A pynput listener that only exists while something needs it: attach()
+    creates and starts a fresh one (pynput listeners cannot be restarted),
+    detach() stops it and removes the OS hook.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.listener = None
+        self._lock = threading.Lock()
+
+    @property
+    def attached(self):
+        return self.listener is not None
+
+    def attach(self):
+        with self._lock:
+            if self.listener is None:
+                self.listener = self.factory()
+                self.listener.start()
+                print(f">> HOOKS: {self.name} listener attached")
+
+    def detach(self):
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+                # Wait for the hook thread so the SPSC ring keeps a single producer
+                self.listener.join(1.0)
+                self.listener = None
+                print(f">> HOOKS: {self.name} listener detached")
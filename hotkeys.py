@@ -1,12 +1,247 @@
-import threading
-from pynput import keyboard
+import time
+from config import add_config_listener, state as app_state
+from executor import get_executor
+from input_control import key_id
 
+# (config key, default, action) of every trigger hotkey, in dispatch order
+TRIGGERS = (
+    ("key_macro_trigger", "Key.f3", "macro"),
+    ("key_throw_trigger", "Key.f4", "throw"),
+    ("key_throw_v2_trigger", "Key.f7", "throw_v2"),
+    ("key_record_trigger", "Key.f5", "record"),
+    ("key_playback_trigger", "Key.f6", "playback"),
+)
 
-def parse_key_string(k_str):
-    if k_str.startswith("Key."):
-        attr = k_str.split(".")[1]
-        return getattr(keyboard.Key, attr, None)
-    return k_str
+# Modifier key ids -> modifier name used in chord bindings
+MODIFIER_KEYS = {
+    "Key.ctrl": "ctrl",
+    "Key.ctrl_l": "ctrl",
+    "Key.ctrl_r": "ctrl",
+    "Key.shift": "shift",
+    "Key.shift_l": "shift",
+    "Key.shift_r": "shift",
+    "Key.alt": "alt",
+    "Key.alt_l": "alt",
+    "Key.alt_r": "alt",
+    "Key.alt_gr": "alt",
+    "Key.cmd": "cmd",
+    "Key.cmd_l": "cmd",
+    "Key.cmd_r": "cmd",
+}
+MODIFIER_NAMES = {
+    "ctrl": "ctrl",
+    "control": "ctrl",
+    "shift": "shift",
+    "alt": "alt",
+    "cmd": "cmd",
+    "win": "cmd",
+}
+NO_MODIFIERS = frozenset()
+DEFAULT_SEQUENCE_TIMEOUT = 1.0
+DEFAULT_MIN_INTERVAL = 0.25
+# A press of a key seen down this recently without a release is auto-repeat
+# (covers the longest OS repeat delay; a lost release expires after this)
+REPEAT_WINDOW = 1.1
+
+
+def retrigger_policy(state, name):
+    """What a trigger does while its macro is still running (ignore, queue, restart)"""
+    return state["config"].get("retrigger_policies", {}).get(name, "ignore")
+
+
+def _binding_key_id(token):
+    if token.startswith("Key.") or token.startswith("vk:"):
+        return token
+    if len(token) == 1:
+        return f"char:{token}"
+    return f"Key.{token.lower()}"
+
+
+def parse_binding(text):
+    """
+    Parse a trigger binding into a tuple of (modifiers, key id) steps:
+    "Key.f4" or "e" (single key), "ctrl+shift+f3" (chord) or
+    "ctrl+k f3" (sequence of chords separated by spaces).
+    Raises ValueError for unknown modifiers or empty bindings.
+    """
+    steps = []
+    for chord in text.split():
+        *modifiers, key = chord.split("+")
+        if not key:
+            raise ValueError(f"Missing key in '{chord}'")
+        try:
+            names = frozenset(MODIFIER_NAMES[m.lower()] for m in modifiers)
+        except KeyError as e:
+            raise ValueError(f"Unknown modifier {e} in '{chord}'") from None
+        steps.append((names, _binding_key_id(key)))
+    if not steps:
+        raise ValueError("Empty hotkey")
+    return tuple(steps)
+
+
+class TrieNode:
+    """One step of the binding trie: actions that fire here, and continuations"""
+
+    __slots__ = ("children", "actions")
+
+    def __init__(self):
+        self.children = {}
+        self.actions = ()
+
+
+def build_binding_trie(config):
+    """Trie over the (modifiers, key id) steps of every trigger binding"""
+    root = TrieNode()
+    for config_key, default, action in TRIGGERS:
+        binding = config.get(config_key, default)
+        try:
+            steps = parse_binding(binding)
+        except ValueError as e:
+            print(f"!! ERROR: Invalid hotkey '{binding}' for {config_key}: {e}")
+            steps = parse_binding(default)
+        node = root
+        for step in steps:
+            node = node.children.setdefault(step, TrieNode())
+        node.actions += (action,)
+    return root
+
+
+class HotkeyMatcher:
+    """
+    Incremental matcher over the binding trie. Tracks the held modifiers
+    from key down/up and the position inside a running sequence, so each
+    key press costs a constant number of dict lookups however many
+    bindings exist. Auto-repeat presses of a held key never match, and an
+    action fires at most once per its minimum retrigger interval.
+    Only used from the hook consumer thread.
+    """
+
+    def __init__(
+        self, root, timeout=DEFAULT_SEQUENCE_TIMEOUT, min_intervals=None, previous=None
+    ):
+        self.root = root
+        self.timeout = timeout
+        self.min_intervals = min_intervals or {}
+        self.node = root
+        self.deadline = 0.0
+        # Physical key state survives rebuilds
+        self.held_modifiers = set(previous.held_modifiers) if previous else set()
+        self.modifiers = frozenset(MODIFIER_KEYS[k] for k in self.held_modifiers)
+        self.down_keys = dict(previous.down_keys) if previous else {}
+        self.last_fired = dict(previous.last_fired) if previous else {}
+        self.repeats = previous.repeats if previous else 0
+        self.debounced = previous.debounced if previous else 0
+
+    def key_up(self, kid):
+        self.down_keys.pop(kid, None)
+        if kid in self.held_modifiers:
+            self.held_modifiers.discard(kid)
+            self.modifiers = frozenset(MODIFIER_KEYS[k] for k in self.held_modifiers)
+
+    def key_down(self, kid, at):
+        """Feed one key press, returns the actions it completes (or None)"""
+        modifier = MODIFIER_KEYS.get(kid)
+        if modifier is not None:
+            if kid not in self.held_modifiers:
+                self.held_modifiers.add(kid)
+                self.modifiers = self.modifiers | {modifier}
+            return None
+
+        # Only real down edges: a repeat of a key that is still down is dropped
+        last_down = self.down_keys.get(kid)
+        self.down_keys[kid] = at
+        if last_down is not None and at - last_down <= REPEAT_WINDOW:
+            self.repeats += 1
+            return None
+
+        modifiers = self.modifiers
+        raw = kid
+        if modifiers and kid.startswith("char:") and len(kid) == 6:
+            # Ctrl+Buchstabe kommt als Steuerzeichen, Shift als Grossbuchstabe
+            char = kid[5]
+            if char < " ":
+                char = chr(ord(char) + 96)
+            kid = f"char:{char.lower()}"
+
+        node = self.node
+        if node is not self.root and at > self.deadline:
+            node = self.root
+        child = self._step(node, modifiers, kid, raw)
+        if child is None and node is not self.root:
+            child = self._step(self.root, modifiers, kid, raw)
+        if child is None:
+            self.node = self.root
+            return None
+
+        if child.children:
+            self.node = child
+            self.deadline = at + self.timeout
+        else:
+            self.node = self.root
+        return self._debounce(child.actions, at)
+
+    def _debounce(self, actions, at):
+        """Drop actions that fired less than their minimum interval ago"""
+        fired = ()
+        for action in actions:
+            last = self.last_fired.get(action)
+            interval = self.min_intervals.get(action, DEFAULT_MIN_INTERVAL)
+            if last is not None and at - last < interval:
+                self.debounced += 1
+                continue
+            self.last_fired[action] = at
+            fired += (action,)
+        return fired
+
+    @staticmethod
+    def _step(node, modifiers, kid, raw):
+        child = node.children.get((modifiers, kid))
+        if child is None and modifiers:
+            # Plain bindings still fire with modifiers held (as before chords)
+            child = node.children.get((NO_MODIFIERS, raw))
+        return child
+
+
+# Swapped in whole on rebuild, so the consumer never sees a half-built trie
+matcher = HotkeyMatcher(TrieNode())
+_binding_signature = None
+
+
+def rebuild_bindings(config):
+    """Config listener: rebuild the matcher only when a binding or interval changed"""
+    global matcher, _binding_signature
+    timeout = float(config.get("hotkey_sequence_timeout", DEFAULT_SEQUENCE_TIMEOUT))
+    min_intervals = {
+        action: float(seconds)
+        for action, seconds in config.get("trigger_min_interval", {}).items()
+    }
+    signature = tuple(config.get(key, default) for key, default, _ in TRIGGERS) + (
+        timeout,
+        tuple(sorted(min_intervals.items())),
+    )
+    if signature == _binding_signature:
+        return False
+    root = build_binding_trie(config)
+    matcher = HotkeyMatcher(root, timeout, min_intervals, previous=matcher)
+    _binding_signature = signature
+    print(f">> HOTKEYS: Bindings built ({len(root.children)} first keys)")
+    return True
+
+
+rebuild_bindings(app_state["config"])
+add_config_listener(rebuild_bindings)
+
+
+def _record_pending_move(state, record_action):
+    """
+    Record the move the sampler still buffers before a key or button event:
+    it happened earlier, and playback moves the cursor only on moves
+    """
+    sampler = state.get("mouse_sampler")
+    pending = sampler.take_pending() if sampler else None
+    if pending is not None:
+        px, py, pending_at = pending
+        record_action("mouse_move", x=px, y=py, at=pending_at)
 
 
 def on_key_press(
@@ -19,80 +254,69 @@ def on_key_press(
     stop_recording,
     playback_recording,
     record_action,
+    at=None,
 ):
     try:
         if state["is_recording"]:
-            record_action("key_press", key=key)
+            _record_pending_move(state, record_action)
+            record_action("key_press", key=key, at=at)
 
-        if not state["config"].get("macro_enabled", True):
-            return
-        target = parse_key_string(state["config"].get("key_macro_trigger", "Key.f3"))
-        if key == target or (hasattr(key, "char") and key.char == target):
-            threading.Thread(target=run_complex_macro).start()
-
-        throw_target = parse_key_string(
-            state["config"].get("key_throw_trigger", "Key.f4")
-        )
-        if key == throw_target or (hasattr(key, "char") and key.char == throw_target):
-            threading.Thread(target=run_throw_macro).start()
-
-        throw_v2_target = parse_key_string(
-            state["config"].get("key_throw_v2_trigger", "Key.f7")
-        )
-        if key == throw_v2_target or (
-            hasattr(key, "char") and key.char == throw_v2_target
-        ):
-            threading.Thread(target=run_throw_macro_v2).start()
-
-        record_trigger = parse_key_string(
-            state["config"].get("key_record_trigger", "Key.f5")
+        # Non-trigger keys stop here after a single trie lookup
+        actions = matcher.key_down(
+            key_id(key), time.perf_counter() if at is None else at
         )
-        if key == record_trigger or (
-            hasattr(key, "char") and key.char == record_trigger
-        ):
-            if state["is_recording"]:
-                stop_recording()
-            else:
-                start_recording()
+        if not actions or not state["config"].get("macro_enabled", True):
+            return
 
-        playback_trigger = parse_key_string(
-            state["config"].get("key_playback_trigger", "Key.f6")
-        )
-        if key == playback_trigger or (
-            hasattr(key, "char") and key.char == playback_trigger
-        ):
-            threading.Thread(target=playback_recording).start()
+        for action in actions:
+            if action == "record":
+                if state["is_recording"]:
+                    stop_recording()
+                else:
+                    start_recording()
+                continue
+            func = {
+                "macro": run_complex_macro,
+                "throw": run_throw_macro,
+                "throw_v2": run_throw_macro_v2,
+                "playback": playback_recording,
+            }[action]
+            get_executor().submit(action, func, retrigger_policy(state, action), at)
     except Exception:
         pass
 
 
-def on_key_release(key, state, record_action):
+def on_key_release(key, state, record_action, at=None):
     try:
+        matcher.key_up(key_id(key))
         if state["is_recording"]:
-            record_action("key_release", key=key)
+            _record_pending_move(state, record_action)
+            record_action("key_release", key=key, at=at)
     except Exception:
         pass
 
 
-def on_mouse_click(x, y, button, pressed, state, record_action):
+def on_mouse_click(x, y, button, pressed, state, record_action, at=None):
     try:
         if state["is_recording"]:
+            _record_pending_move(state, record_action)
             if pressed:
-                record_action("mouse_press", button=button, x=x, y=y)
+                record_action("mouse_press", button=button, x=x, y=y, at=at)
             else:
-                record_action("mouse_release", button=button, x=x, y=y)
+                record_action("mouse_release", button=button, x=x, y=y, at=at)
     except Exception:
         pass
 
 
-def on_mouse_move(x, y, state, record_action):
-    import time
-
+def on_mouse_move(x, y, state, record_action, at=None):
     try:
         if state["is_recording"]:
-            current_time = time.time()
-            if current_time - state["last_mouse_move_time"] >= 0.02:
-                record_action("mouse_move", x=x, y=y)
-                state["last_mouse_move_time"] = current_time
+            if at is None:
+                at = time.perf_counter()
+            # The sampler may hand back an earlier, buffered move
+            move = state["mouse_sampler"].add(x, y, at)
+            if move is not None:
+                mx, my, move_at = move
+                record_action("mouse_move", x=mx, y=my, at=move_at)
     except Exception:
         pass
@@ -1,16 +1,95 @@
 import ctypes
+import os
 import time
-import math
-from pynput import keyboard
-from pynput.keyboard import Controller as KeyboardController
-from pynput.mouse import Controller as MouseController, Button
+import timing
+from timing import wait_until
 
-keyboard_controller = KeyboardController()
-mouse = MouseController()
+try:
+    from pynput import keyboard
+    from pynput.keyboard import Controller as KeyboardController
+    from pynput.mouse import Controller as MouseController, Button
+except ImportError:
+    # Headless / no display: only the Win32 and memory backends are usable
+    keyboard = KeyboardController = MouseController = Button = None
 
-SendInput = ctypes.windll.user32.SendInput
+try:
+    SendInput = ctypes.windll.user32.SendInput
+    MapVirtualKeyW = ctypes.windll.user32.MapVirtualKeyW
+    # Wide version: the A one would truncate non-Latin-1 chars to a byte
+    VkKeyScanW = ctypes.windll.user32.VkKeyScanW
+    VkKeyScanW.argtypes = [ctypes.c_wchar]
+    VkKeyScanW.restype = ctypes.c_short
+except AttributeError:
+    # Not on Windows: batches can still be built and sent to a stand-in
+    SendInput = MapVirtualKeyW = VkKeyScanW = None
 PUL = ctypes.POINTER(ctypes.c_ulong)
 
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+MAPVK_VK_TO_VSC = 0
+
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_RIGHTDOWN = 0x0008
+MOUSEEVENTF_RIGHTUP = 0x0010
+MOUSEEVENTF_MIDDLEDOWN = 0x0020
+MOUSEEVENTF_MIDDLEUP = 0x0040
+
+VK_TAB = 0x09
+VK_SHIFT = 0x10
+VK_E = 0x45
+VK_OEM_4 = 0xDB  # [
+
+# Keys whose scan code needs the E0 prefix (KEYEVENTF_EXTENDEDKEY), as pynput sends them
+EXTENDED_VKS = frozenset(
+    (0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2D, 0x2E)
+    + (0x5B, 0x5C, 0x5D, 0x6F, 0x90, 0xA3, 0xA5)
+)
+
+# Mouse flag -> (recording action type, button name)
+MOUSE_FLAG_EVENTS = {
+    MOUSEEVENTF_LEFTDOWN: ("mouse_press", "left"),
+    MOUSEEVENTF_LEFTUP: ("mouse_release", "left"),
+    MOUSEEVENTF_RIGHTDOWN: ("mouse_press", "right"),
+    MOUSEEVENTF_RIGHTUP: ("mouse_release", "right"),
+    MOUSEEVENTF_MIDDLEDOWN: ("mouse_press", "middle"),
+    MOUSEEVENTF_MIDDLEUP: ("mouse_release", "middle"),
+}
+
+# Button name -> (down flag, up flag)
+BUTTON_FLAGS = {
+    "left": (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP),
+    "right": (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP),
+    "middle": (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP),
+}
+
+# Virtual keys for "Key.<name>" identities when pynput is not available
+KEY_NAME_VKS = {
+    "backspace": 0x08,
+    "tab": 0x09,
+    "enter": 0x0D,
+    "shift": 0x10,
+    "ctrl": 0x11,
+    "alt": 0x12,
+    "esc": 0x1B,
+    "space": 0x20,
+    "left": 0x25,
+    "up": 0x26,
+    "right": 0x27,
+    "down": 0x28,
+    "shift_l": 0xA0,
+    "shift_r": 0xA1,
+    "ctrl_l": 0xA2,
+    "ctrl_r": 0xA3,
+    "alt_l": 0xA4,
+    "alt_r": 0xA5,
+    **{f"f{i}": 0x6F + i for i in range(1, 13)},
+}
+
 
 class KeyBdInput(ctypes.Structure):
     _fields_ = [
@@ -49,71 +128,507 @@ class Input(ctypes.Structure):
     _fields_ = [("type", ctypes.c_ulong), ("ii", Input_I)]
 
 
-def click_mouse_fast():
-    extra = ctypes.c_ulong(0)
+INPUT_SIZE = ctypes.sizeof(Input)
+
+# Shared dwExtraInfo target, SendInput only copies the pointer value
+_extra = ctypes.c_ulong(0)
+_extra_ptr = ctypes.pointer(_extra)
+
+_send_input = SendInput
+
+
+def set_send_input(func):
+    """Replace the SendInput syscall used by the batch API, returns the previous one"""
+    global _send_input
+    previous = _send_input
+    _send_input = func
+    return previous
+
+
+def scan_code(vk):
+    """Hardware scan code of a virtual key (0 off Windows)"""
+    if MapVirtualKeyW is None:
+        return 0
+    return MapVirtualKeyW(vk, MAPVK_VK_TO_VSC)
+
+
+def key_input(vk, up=False):
+    """
+    Build a keyboard Input record for a virtual key. Like pynput, it carries
+    the scan code too, for games that read scan codes instead of VKs.
+    """
+    flags = KEYEVENTF_KEYUP if up else 0
+    if vk in EXTENDED_VKS:
+        flags |= KEYEVENTF_EXTENDEDKEY
     ii_ = Input_I()
-    ii_.mi = MouseInput(0, 0, 0, 0x0002, 0, ctypes.pointer(extra))
-    SendInput(1, ctypes.pointer(Input(ctypes.c_ulong(0), ii_)), ctypes.sizeof(Input))
+    ii_.ki = KeyBdInput(vk, scan_code(vk), flags, 0, _extra_ptr)
+    return Input(INPUT_KEYBOARD, ii_)
 
-    time.sleep(0.02 + (time.time() % 0.02))
 
-    ii_.mi = MouseInput(0, 0, 0, 0x0004, 0, ctypes.pointer(extra))
-    SendInput(1, ctypes.pointer(Input(ctypes.c_ulong(0), ii_)), ctypes.sizeof(Input))
+def mouse_input(flags, dx=0, dy=0, data=0):
+    """Build a mouse Input record"""
+    ii_ = Input_I()
+    ii_.mi = MouseInput(dx, dy, data, flags, 0, _extra_ptr)
+    return Input(INPUT_MOUSE, ii_)
 
 
-def tap_e(dwell=0.03):
-    """Tap E key"""
-    keyboard_controller.press(keyboard.KeyCode.from_char("e"))
-    time.sleep(dwell)
-    keyboard_controller.release(keyboard.KeyCode.from_char("e"))
+def build_batch(inputs):
+    """Pack Input records into one contiguous Input * N array"""
+    inputs = list(inputs)
+    return (Input * len(inputs))(*inputs)
 
 
-def tap_tab(dwell=0.03):
-    """Tap Tab key"""
-    keyboard_controller.press(keyboard.Key.tab)
-    time.sleep(dwell)
-    keyboard_controller.release(keyboard.Key.tab)
+# Prebuilt single-record batches, reused by every caller on the hot path
+_key_down_pool = {}
+_key_up_pool = {}
+_mouse_pool = {}
 
 
-def move_mouse_up_angle(distance, angle_deg=70, horizontal_dir=1, smooth_steps=30):
-    """Move mouse at angle"""
-    angle_rad = math.radians(angle_deg)
-    dx = horizontal_dir * distance * math.cos(angle_rad)
-    dy = -distance * math.sin(angle_rad)
+def pooled_key(vk, up=False):
+    """Prebuilt Input * 1 batch for a key down/up, built once per key"""
+    pool = _key_up_pool if up else _key_down_pool
+    batch = pool.get(vk)
+    if batch is None:
+        batch = pool[vk] = build_batch([key_input(vk, up)])
+    return batch
 
-    start_x, start_y = mouse.position
-    for i in range(smooth_steps + 1):
-        t = i / smooth_steps
-        x = start_x + dx * t
-        y = start_y + dy * t
-        mouse.position = (int(x), int(y))
-        time.sleep(0.001)
+
+def pooled_mouse(flags):
+    """Prebuilt Input * 1 batch for a mouse button event, built once per flag set"""
+    batch = _mouse_pool.get(flags)
+    if batch is None:
+        batch = _mouse_pool[flags] = build_batch([mouse_input(flags)])
+    return batch
+
+
+def preload_pool(vks=(VK_TAB, VK_SHIFT, VK_E)):
+    """Build pooled records for the given keys and all mouse buttons up front"""
+    for vk in vks:
+        pooled_key(vk)
+        pooled_key(vk, up=True)
+    for flags in (
+        MOUSEEVENTF_LEFTDOWN,
+        MOUSEEVENTF_LEFTUP,
+        MOUSEEVENTF_RIGHTDOWN,
+        MOUSEEVENTF_RIGHTUP,
+        MOUSEEVENTF_MIDDLEDOWN,
+        MOUSEEVENTF_MIDDLEUP,
+    ):
+        pooled_mouse(flags)
+
+
+preload_pool()
+
+
+def describe_input(record):
+    """Decode an Input record into a plain tuple"""
+    if record.type == INPUT_KEYBOARD:
+        ki = record.ii.ki
+        return ("key", ki.wVk, bool(ki.dwFlags & KEYEVENTF_KEYUP))
+    mi = record.ii.mi
+    return ("mouse", mi.dwFlags, mi.dx, mi.dy)
+
+
+class RecordingSendInput:
+    """SendInput stand-in that records every call instead of injecting"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.calls = []
+
+    def __call__(self, count, inputs, size):
+        events = [describe_input(inputs[i]) for i in range(count)]
+        self.calls.append((self.clock(), events))
+        return count
+
+    def events(self):
+        """All recorded events in injection order"""
+        return [event for _, batch in self.calls for event in batch]
+
+
+def key_id(key):
+    """Portable string identity of a key ("char:e", "vk:219", "Key.tab")"""
+    if isinstance(key, str):
+        return f"char:{key}" if len(key) == 1 else key
+    char = getattr(key, "char", None)
+    if char:
+        return f"char:{char}"
+    vk = getattr(key, "vk", None)
+    if vk is not None:
+        return f"vk:{vk}"
+    name = getattr(key, "name", None)
+    if name:
+        return f"Key.{name}"
+    return str(key)
+
+
+def button_name(button):
+    """Portable name of a mouse button ("left", "right", "middle")"""
+    if isinstance(button, str):
+        return button
+    return getattr(button, "name", str(button))
+
+
+def ascii_vk_scan(char):
+    """VkKeyScan-style lookup (vk | shift << 8) for plain ASCII, -1 if unmapped"""
+    if "a" <= char <= "z" or "0" <= char <= "9":
+        return ord(char.upper())
+    if "A" <= char <= "Z":
+        return ord(char) | 0x100
+    if char == "[":
+        return VK_OEM_4
+    if char == "]":
+        return 0xDD
+    return -1
+
+
+class InputBackend:
+    """
+    Interface every input backend implements, selected once via set_backend().
+    Callers go through input_control.backend and bind the methods they need
+    when a macro starts, so the hot path pays no dispatch cost.
+    """
+
+    name = "base"
+
+    def send_key(self, vk, up=False):
+        raise NotImplementedError
+
+    def send_mouse(self, flags):
+        raise NotImplementedError
+
+    def send_batch(self, batch):
+        """Decode an Input array and inject it event by event"""
+        for i in range(len(batch)):
+            event = describe_input(batch[i])
+            if event[0] == "key":
+                self.send_key(event[1], up=event[2])
+            elif event[1] & MOUSEEVENTF_MOVE:
+                x, y = self.get_position()
+                self.set_position(x + event[2], y + event[3])
+            else:
+                self.send_mouse(event[1])
+        return len(batch)
+
+    def prepare_group(self, events):
+        """
+        Turn one same-timestamp group of (action_type, target, x, y) recording
+        events into whatever send_group() injects, ahead of playback
+        """
+        return tuple(events)
+
+    def send_group(self, group):
+        """Inject a prepared group in its original order"""
+        for action_type, target, x, y in group:
+            if action_type == "key_press":
+                self.press_key(target)
+            elif action_type == "key_release":
+                self.release_key(target)
+            elif action_type == "mouse_press":
+                self.press_button(target)
+            elif action_type == "mouse_release":
+                self.release_button(target)
+            elif action_type == "mouse_move":
+                self.set_position(x, y)
+
+    def press_key(self, key):
+        raise NotImplementedError
+
+    def release_key(self, key):
+        raise NotImplementedError
+
+    def press_button(self, button):
+        self.send_mouse(BUTTON_FLAGS[button_name(button)][0])
+
+    def release_button(self, button):
+        self.send_mouse(BUTTON_FLAGS[button_name(button)][1])
+
+    def get_position(self):
+        raise NotImplementedError
+
+    def set_position(self, x, y):
+        raise NotImplementedError
+
+    def char_to_vk(self, char):
+        return ascii_vk_scan(char)
+
+
+class POINT(ctypes.Structure):
+    _fields_ = [("x", ctypes.c_long), ("y", ctypes.c_long)]
+
+
+# Steps of a prepared Win32 playback group
+_STEP_BATCH, _STEP_MOVE, _STEP_FALLBACK = range(3)
+
+
+class Win32Backend(InputBackend):
+    """SendInput backend using the pooled INPUT records"""
+
+    name = "win32"
+
+    def __init__(self):
+        self.user32 = ctypes.windll.user32 if SendInput is not None else None
+        self._point = POINT()
+        self._vks = {}
+        self._fallback = None
+
+    def send_key(self, vk, up=False):
+        return _send_input(1, pooled_key(vk, up), INPUT_SIZE)
+
+    def send_mouse(self, flags):
+        return _send_input(1, pooled_mouse(flags), INPUT_SIZE)
+
+    def send_batch(self, batch):
+        return _send_input(len(batch), batch, INPUT_SIZE)
+
+    def _vk(self, key):
+        vk = self._vks.get(key)
+        if vk is None:
+            vk = self._vks[key] = self._resolve_vk(key_id(key))
+        return vk
+
+    def _resolve_vk(self, ident):
+        if ident.startswith("vk:"):
+            return int(ident[3:])
+        if ident.startswith("char:"):
+            result = self.char_to_vk(ident[5:])
+            # Shifted or unmapped characters go through pynput instead
+            return result if 0 <= result <= 0xFF else -1
+        if ident.startswith("Key."):
+            if keyboard is not None:
+                member = getattr(keyboard.Key, ident[4:], None)
+                if member is not None and member.value.vk is not None:
+                    return member.value.vk
+            return KEY_NAME_VKS.get(ident[4:], -1)
+        return -1
+
+    def _press_fallback(self, key, up):
+        if keyboard is None:
+            print(f"!! ERROR: Cannot map key {key_id(key)} to virtual key")
+            return
+        if self._fallback is None:
+            self._fallback = PynputBackend()
+        if up:
+            self._fallback.release_key(key)
+        else:
+            self._fallback.press_key(key)
+
+    def prepare_group(self, events):
+        """
+        Key and button events become prebuilt Input arrays, one SendInput per
+        run of them; moves (SetCursorPos) and unmapped keys split the runs
+        """
+        steps = []
+        inputs = []
+
+        def flush():
+            if inputs:
+                steps.append((_STEP_BATCH, build_batch(inputs), None))
+                inputs.clear()
+
+        for action_type, target, x, y in events:
+            if action_type in ("key_press", "key_release"):
+                up = action_type == "key_release"
+                vk = self._vk(target)
+                if vk < 0:
+                    flush()
+                    steps.append((_STEP_FALLBACK, target, up))
+                else:
+                    inputs.append(key_input(vk, up))
+            elif action_type in ("mouse_press", "mouse_release"):
+                flags = BUTTON_FLAGS[button_name(target)]
+                inputs.append(mouse_input(flags[action_type == "mouse_release"]))
+            elif action_type == "mouse_move":
+                flush()
+                steps.append((_STEP_MOVE, int(x), int(y)))
+        flush()
+        return tuple(steps)
+
+    def send_group(self, group):
+        for kind, first, second in group:
+            if kind == _STEP_BATCH:
+                _send_input(len(first), first, INPUT_SIZE)
+            elif kind == _STEP_MOVE:
+                self.user32.SetCursorPos(first, second)
+            else:
+                self._press_fallback(first, second)
+
+    def press_key(self, key):
+        vk = self._vk(key)
+        if vk < 0:
+            return self._press_fallback(key, False)
+        return self.send_key(vk)
+
+    def release_key(self, key):
+        vk = self._vk(key)
+        if vk < 0:
+            return self._press_fallback(key, True)
+        return self.send_key(vk, up=True)
+
+    def get_position(self):
+        self.user32.GetCursorPos(ctypes.byref(self._point))
+        return self._point.x, self._point.y
+
+    def set_position(self, x, y):
+        self.user32.SetCursorPos(int(x), int(y))
+
+    def char_to_vk(self, char):
+        if len(char) != 1:
+            return -1
+        if VkKeyScanW is None:
+            return ascii_vk_scan(char)
+        return VkKeyScanW(char)
+
+
+class PynputBackend(InputBackend):
+    """Backend using the pynput keyboard and mouse controllers"""
+
+    name = "pynput"
+
+    def __init__(self):
+        if keyboard is None:
+            raise RuntimeError("pynput is not available on this system")
+        self.keyboard = KeyboardController()
+        self.mouse = MouseController()
+        self._keys = {}
+        self._vk_keys = {}
+
+    def _key(self, key):
+        if not isinstance(key, str):
+            return key
+        parsed = self._keys.get(key)
+        if parsed is None:
+            ident = key_id(key)
+            if ident.startswith("char:"):
+                parsed = keyboard.KeyCode.from_char(ident[5:])
+            elif ident.startswith("vk:"):
+                parsed = keyboard.KeyCode.from_vk(int(ident[3:]))
+            else:
+                parsed = getattr(keyboard.Key, ident[4:], None)
+            self._keys[key] = parsed
+        return parsed
+
+    def send_key(self, vk, up=False):
+        key = self._vk_keys.get(vk)
+        if key is None:
+            key = self._vk_keys[vk] = keyboard.KeyCode.from_vk(vk)
+        if up:
+            self.keyboard.release(key)
+        else:
+            self.keyboard.press(key)
+
+    def send_mouse(self, flags):
+        action_type, name = MOUSE_FLAG_EVENTS[flags]
+        if action_type == "mouse_press":
+            self.mouse.press(Button[name])
+        else:
+            self.mouse.release(Button[name])
+
+    def press_key(self, key):
+        self.keyboard.press(self._key(key))
+
+    def release_key(self, key):
+        self.keyboard.release(self._key(key))
+
+    def press_button(self, button):
+        self.mouse.press(Button[button_name(button)])
+
+    def release_button(self, button):
+        self.mouse.release(Button[button_name(button)])
+
+    def get_position(self):
+        return self.mouse.position
+
+    def set_position(self, x, y):
+        self.mouse.position = (int(x), int(y))
+
+
+class MemoryBackend(InputBackend):
+    """Headless backend that logs timestamped events instead of injecting them"""
+
+    name = "memory"
+
+    def __init__(self, clock=timing.perf_counter):
+        self.clock = clock
+        self.events = []
+        self.position = (0, 0)
+
+    def _log(self, action_type, value):
+        self.events.append((self.clock(), action_type, value))
+
+    def send_key(self, vk, up=False):
+        self._log("key_release" if up else "key_press", f"vk:{vk}")
+
+    def send_mouse(self, flags):
+        self._log(*MOUSE_FLAG_EVENTS[flags])
+
+    def press_key(self, key):
+        self._log("key_press", key_id(key))
+
+    def release_key(self, key):
+        self._log("key_release", key_id(key))
+
+    def press_button(self, button):
+        self._log("mouse_press", button_name(button))
+
+    def release_button(self, button):
+        self._log("mouse_release", button_name(button))
+
+    def get_position(self):
+        return self.position
+
+    def set_position(self, x, y):
+        self.position = (int(x), int(y))
+        self._log("mouse_move", self.position)
+
+    def clear(self):
+        self.events = []
+
+
+BACKENDS = {
+    "win32": Win32Backend,
+    "pynput": PynputBackend,
+    "memory": MemoryBackend,
+}
+
+backend = None
+
+
+def create_backend(name="auto"):
+    """Instantiate a backend by name, "auto" picks the best one for this system"""
+    if name == "auto":
+        if SendInput is not None:
+            name = "win32"
+        elif keyboard is not None:
+            name = "pynput"
+        else:
+            name = "memory"
+    return BACKENDS[name]()
+
+
+def set_backend(new_backend):
+    """
+    Select the input backend, returns the previous one. Look it up as
+    input_control.backend, importing the name would keep the old one.
+    """
+    global backend
+    previous, backend = backend, new_backend
+    return previous
+
+
+set_backend(create_backend(os.environ.get("MACRO_INPUT_BACKEND", "auto")))
 
 
-def move_mouse_horizontal(distance, duration=0.5, steps=50):
-    """Move mouse horizontally (negative distance = left)"""
+def move_mouse_horizontal(distance, duration=0.5, steps=50, start=None):
+    """Move mouse horizontally (negative distance = left), step i at start + i * duration / steps"""
+    if start is None:
+        start = timing.perf_counter()
     dx = distance
-    start_x, start_y = mouse.position
+    step_time = duration / steps
+    set_position = backend.set_position
+    start_x, start_y = backend.get_position()
     for i in range(steps + 1):
+        wait_until(start + i * step_time)
         t = i / steps
         x = start_x + dx * t
-        mouse.position = (int(x), start_y)
-        time.sleep(duration / steps)
-
-
-def double_click_left(hold_time=0.022, gap=0.055):
-    """Double click left mouse button"""
-    mouse.press(Button.left)
-    time.sleep(hold_time)
-    mouse.release(Button.left)
-    time.sleep(gap)
-    mouse.press(Button.left)
-    time.sleep(hold_time)
-    mouse.release(Button.left)
-
-
-def tap_bracket(dwell=0.006):
-    """Tap bracket key"""
-    keyboard_controller.press(keyboard.KeyCode.from_vk(219))
-    time.sleep(dwell)
-    keyboard_controller.release(keyboard.KeyCode.from_vk(219))
+        set_position(x, start_y)
@@ -1,29 +1,77 @@
-import time
-import threading
-import ctypes
-from pynput import keyboard
+import timing
+from collections import namedtuple
+import input_control
+from config import add_config_listener
+from network import send_clumsy_hotkey
+from telemetry import mark_first_input
+from timing import MacroCancelled, PeriodicBurst, Timeline, merge_lanes, run_heap
 from input_control import (
-    Input_I,
-    MouseInput,
-    KeyBdInput,
-    Input,
-    SendInput,
-    click_mouse_fast,
-    keyboard_controller,
-    mouse,
+    MOUSE_FLAG_EVENTS,
+    MOUSEEVENTF_LEFTDOWN,
+    MOUSEEVENTF_LEFTUP,
+    VK_E,
+    VK_TAB,
     move_mouse_horizontal,
 )
-from pynput.mouse import Button
 
+# Step kinds that inject input directly (call steps mark their own first input)
+INPUT_STEP_KINDS = ("key", "vk", "button", "mouse", "drag")
+
+# One scheduled action of a compiled macro plan, offset in seconds from start
+Step = namedtuple("Step", "offset label kind args message", defaults=(None,))
+
+# Config keys each throw plan is compiled from
+THROW_PLAN_KEYS = (
+    "throw_start_settle_delay",
+    "throw_pre_drag_delay",
+    "throw_tab_delay_after_drag",
+    "throw_final_settle_delay",
+    "throw_pre_spam_delay",
+    "throw_post_tab_to_spam_delay",
+    "throw_post_clumsy_tap_delay",
+    "throw_post_tab_tap_delay",
+    "throw_clumsy_deactivate_after_spam",
+    "throw_tab_dwell",
+    "throw_e_dwell",
+    "throw_spam_duration",
+    "throw_e_period",
+    "throw_drag_time",
+    "throw_drag_left_pixels",
+    "clumsy_hotkey",
+    "spam_catch_up",
+)
 
-def run_throw_macro(state):
-    if not state["config"].get("throw_enabled", True):
-        return
 
-    print(">> THROW MACRO: STARTING")
-    start_time = time.perf_counter()
+class MacroPlan:
+    """Immutable, precompiled schedule of a macro"""
 
-    c = state["config"]
+    def __init__(self, name, steps, signature):
+        self.name = name
+        self.steps = tuple(steps)
+        self.signature = signature
+        self.duration = self.steps[-1].offset if self.steps else 0.0
+        # Call that reverts the plan's blocking toggle (the burst's toggle)
+        self.toggle_undo = next(
+            (step.args[3] for step in self.steps if step.kind == "burst"), None
+        )
+
+    def dump(self):
+        """Readable listing of the plan for debugging"""
+        lines = [f"{self.name}: {len(self.steps)} steps, {self.duration:.3f}s planned"]
+        for step in self.steps:
+            lines.append(
+                f"  {step.offset * 1000:9.2f} ms  {step.label:<14} {step.kind:<7} "
+                f"{step.args}"
+            )
+        return "\n".join(lines)
+
+
+def plan_signature(config):
+    return tuple(config.get(key) for key in THROW_PLAN_KEYS)
+
+
+def compile_throw_plan(c):
+    """Compile run_throw_macro (pynput-style keys, Clumsy hotkey) into a plan"""
     KEY_START_SETTLE_DELAY = c.get("throw_start_settle_delay", 0.03)
     KEY_PRE_DRAG_DELAY = c.get("throw_pre_drag_delay", 0.06)
     KEY_TAB_DELAY_AFTER_DRAG = c.get("throw_tab_delay_after_drag", 0.3)
@@ -44,107 +92,72 @@ def run_throw_macro(state):
 
     KEY_DRAG_TIME = c.get("throw_drag_time", 0.5)
     KEY_DRAG_LEFT_PIXELS = c.get("throw_drag_left_pixels", -2000)
-
-    # Importiere Clumsy-Hotkey-Funktion und Maus-/Tastatur-Helfer
-    from network import send_clumsy_hotkey
-    from input_control import move_mouse_horizontal, tap_tab
+    SPAM_CATCH_UP = c.get("spam_catch_up", "skip")
 
     # Lese konfigurierten Clumsy-Hotkey
-    clumsy_hotkey = state["config"].get("clumsy_hotkey", "8")
-    # KeyCode für die E-Taste vorbereiten
-    E_KEY = keyboard.KeyCode.from_char("e")
+    clumsy_hotkey = c.get("clumsy_hotkey", "8")
 
+    steps = []
     # ===== PHASE 1: Initial Settle + Clumsy Hotkey Press =====
-    # Kurze Pause zum Stabilisieren
-    time.sleep(max(0.0, KEY_START_SETTLE_DELAY))
-
-    # Clumsy einmal kurz toggeln (send_clumsy_hotkey enthält bereits eigenes Timing)
-    send_clumsy_hotkey(clumsy_hotkey)
+    # Kurze Pause zum Stabilisieren, dann Clumsy einmal kurz toggeln
+    offset = max(0.0, KEY_START_SETTLE_DELAY)
+    steps.append(Step(offset, "clumsy toggle", "call", ("clumsy", clumsy_hotkey)))
     # Kurzer Puffer nach dem Clumsy-Hotkey
-    time.sleep(POST_CLUMSY_TAP_DELAY)
+    offset += POST_CLUMSY_TAP_DELAY
 
     # ===== PHASE 2: PRE-DRAG DELAY =====
-    # Kurzer Delay vor dem Drag
-    time.sleep(max(0.0, KEY_PRE_DRAG_DELAY))
+    offset += max(0.0, KEY_PRE_DRAG_DELAY)
 
     # ===== PHASE 3: Mouse Drag mit Button Down =====
-    # Linke Maustaste drücken (halten)
-    mouse.press(Button.left)
-
-    # Horizontalen Drag ausführen (links, 2000px, 0.5s)
-    move_mouse_horizontal(KEY_DRAG_LEFT_PIXELS, duration=KEY_DRAG_TIME, steps=50)
-
-    # Maustaste nach dem Drag loslassen
-    mouse.release(Button.left)
+    steps.append(Step(offset, "pre-drag", "button", ("left", False)))
+    steps.append(
+        Step(offset, "drag", "drag", (KEY_DRAG_LEFT_PIXELS, KEY_DRAG_TIME, 50))
+    )
+    offset += KEY_DRAG_TIME
+    steps.append(Step(offset, "drag end", "button", ("left", True)))
 
     # ===== PHASE 4: Tab Press =====
-    # Wartezeit nach Drag, bevor Tab gesendet wird
-    time.sleep(max(0.0, KEY_TAB_DELAY_AFTER_DRAG))
-
-    # Tab drücken (kurzer Tap)
-    tap_tab(dwell=KEY_TAB_DWELL)
-    # Mini-Post-Delay nach Tab
-    time.sleep(POST_TAB_TAP_DELAY)
-
-    # Sicherheitshalber Tab loslassen
-    keyboard_controller.release(keyboard.Key.tab)
+    offset += max(0.0, KEY_TAB_DELAY_AFTER_DRAG)
+    steps.append(Step(offset, "tab", "key", ("Key.tab", False)))
+    offset += KEY_TAB_DWELL
+    steps.append(Step(offset, "tab dwell", "key", ("Key.tab", True)))
+    # Mini-Post-Delay nach Tab, dann sicherheitshalber Tab loslassen
+    offset += POST_TAB_TAP_DELAY
+    steps.append(Step(offset, "post-tab", "key", ("Key.tab", True)))
 
     # ===== PHASE 5: E-SPAM DELAYS =====
-    # Sofort weiter (kein zusätzlicher Delay)
-    time.sleep(max(0.0, KEY_PRE_SPAM_DELAY))
-    # Kurzer Delay zwischen Tab und Spam
-    time.sleep(max(0.0, KEY_POST_TAB_TO_E_SPAM_DELAY))
-    # Delay bis Clumsy wieder getoggelt wird
-    time.sleep(max(0.0, KEY_CLUMSY_HOTKEY_E_START_DELAY))
+    offset += max(0.0, KEY_PRE_SPAM_DELAY)
+    offset += max(0.0, KEY_POST_TAB_TO_E_SPAM_DELAY)
+    offset += max(0.0, KEY_CLUMSY_HOTKEY_E_START_DELAY)
 
     # ===== PHASE 6: E-SPAM =====
-    # Spam-Startzeit merken
-    spam_start_time = time.perf_counter()
-    # Spam-Endzeit berechnen
-    spam_end = spam_start_time + KEY_SPAM_DURATION
-    # Flag: Clumsy schon deaktiviert?
-    clumsy_deactivated = False
-
-    while time.perf_counter() < spam_end:
-        # E drücken
-        keyboard_controller.press(E_KEY)
-        # E gehalten lassen für dwell-Zeit
-        time.sleep(KEY_E_DWELL)
-        # E loslassen
-        keyboard_controller.release(E_KEY)
-
-        # Clumsy nach 0.20s Spam toggeln (späteres Deaktivieren)
-        if (
-            not clumsy_deactivated
-            and (time.perf_counter() - spam_start_time) >= CLUMSY_DEACTIVATE_AFTER_SPAM
-        ):
-            send_clumsy_hotkey(clumsy_hotkey)
-            clumsy_deactivated = True
-
-        # Pause bis zum nächsten E-Press
-        time.sleep(KEY_E_PERIOD)
+    # Ein E-Zyklus = dwell + Pause, Clumsy wird nach 0.20s Spam deaktiviert
+    e_spam = PeriodicBurst.from_dwell(
+        KEY_E_DWELL, KEY_E_PERIOD, KEY_SPAM_DURATION, SPAM_CATCH_UP
+    )
+    steps.append(
+        Step(
+            offset,
+            "e-spam",
+            "burst",
+            (
+                e_spam,
+                ("key", "char:e"),
+                CLUMSY_DEACTIVATE_AFTER_SPAM,
+                ("clumsy", clumsy_hotkey),
+            ),
+        )
+    )
 
     # ===== PHASE 7: Cleanup =====
-    # Abschluss-Delay
-    time.sleep(max(0.0, KEY_FINAL_SETTLE_DELAY))
+    offset += KEY_SPAM_DURATION + max(0.0, KEY_FINAL_SETTLE_DELAY)
+    steps.append(Step(offset, "final settle", "wait", ()))
 
-    # Abschluss-Log mit Gesamtdauer
-    print(f">> THROW MACRO: COMPLETE ({time.perf_counter() - start_time:.3f}s)")
+    return MacroPlan("throw", steps, plan_signature(c))
 
 
-def run_throw_macro_v2(state, update_overlay, disconnect_net, reconnect_net):
-    """
-    Throw Macro Version 2 - Uses robust input methods from run_complex_macro
-    Sequence: Clumsy activate → Drag → Tab → E-spam → Clumsy deactivate
-    """
-    if not state["config"].get("throw_enabled", True):
-        return
-
-    print(">> THROW MACRO V2: STARTING")
-    start_time = time.perf_counter()
-
-    c = state["config"]
-
+def compile_throw_v2_plan(c):
+    """Compile run_throw_macro_v2 (SendInput virtual keys, network toggles) into a plan"""
     KEY_START_SETTLE_DELAY = c.get("throw_start_settle_delay", 0.03)
     KEY_PRE_DRAG_DELAY = c.get("throw_pre_drag_delay", 0.06)
     KEY_TAB_DELAY_AFTER_DRAG = c.get("throw_tab_delay_after_drag", 0.3)
@@ -162,75 +175,278 @@ def run_throw_macro_v2(state, update_overlay, disconnect_net, reconnect_net):
 
     KEY_DRAG_TIME = c.get("throw_drag_time", 0.5)
     KEY_DRAG_LEFT_PIXELS = c.get("throw_drag_left_pixels", -2000)
+    SPAM_CATCH_UP = c.get("spam_catch_up", "skip")
+
+    steps = []
+    offset = max(0.0, KEY_START_SETTLE_DELAY)
+    steps.append(
+        Step(
+            offset,
+            "clumsy toggle",
+            "call",
+            ("disconnect",),
+            ">> THROW V2: ACTIVATING CLUMSY",
+        )
+    )
+    offset += 0.05
+
+    offset += max(0.0, KEY_PRE_DRAG_DELAY)
+    steps.append(
+        Step(
+            offset,
+            "pre-drag",
+            "mouse",
+            (MOUSEEVENTF_LEFTDOWN,),
+            ">> THROW V2: DRAG START",
+        )
+    )
+    steps.append(
+        Step(offset, "drag", "drag", (KEY_DRAG_LEFT_PIXELS, KEY_DRAG_TIME, 50))
+    )
+    offset += KEY_DRAG_TIME
+    steps.append(
+        Step(
+            offset,
+            "drag end",
+            "mouse",
+            (MOUSEEVENTF_LEFTUP,),
+            ">> THROW V2: DRAG COMPLETE",
+        )
+    )
+
+    offset += max(0.0, KEY_TAB_DELAY_AFTER_DRAG)
+    steps.append(Step(offset, "tab", "vk", (VK_TAB, False), ">> THROW V2: TAB PRESS"))
+    offset += KEY_TAB_DWELL
+    steps.append(Step(offset, "tab dwell", "vk", (VK_TAB, True)))
+
+    offset += POST_TAB_TAP_DELAY
+    offset += max(0.0, KEY_POST_TAB_TO_E_SPAM_DELAY)
+
+    e_spam = PeriodicBurst.from_dwell(
+        KEY_E_DWELL, KEY_E_PERIOD, KEY_SPAM_DURATION, SPAM_CATCH_UP
+    )
+    steps.append(
+        Step(
+            offset,
+            "e-spam",
+            "burst",
+            (e_spam, ("vk", VK_E), CLUMSY_DEACTIVATE_AFTER_SPAM, ("reconnect",)),
+            ">> THROW V2: E-SPAM START",
+        )
+    )
 
-    E_KEYCODE = 0x45
-    TAB_KEYCODE = 0x09
+    offset += KEY_SPAM_DURATION + max(0.0, KEY_FINAL_SETTLE_DELAY)
+    steps.append(Step(offset, "final settle", "wait", ()))
 
-    time.sleep(max(0.0, KEY_START_SETTLE_DELAY))
+    return MacroPlan("throw_v2", steps, plan_signature(c))
 
-    print(">> THROW V2: ACTIVATING CLUMSY")
-    disconnect_net()
-    time.sleep(0.05)
 
-    time.sleep(max(0.0, KEY_PRE_DRAG_DELAY))
+PLAN_COMPILERS = {
+    "throw": compile_throw_plan,
+    "throw_v2": compile_throw_v2_plan,
+}
 
-    print(">> THROW V2: DRAG START")
-    extra = ctypes.c_ulong(0)
-    ii_ = Input_I()
-    ii_.mi = MouseInput(0, 0, 0, 0x0002, 0, ctypes.pointer(extra))
-    SendInput(1, ctypes.pointer(Input(ctypes.c_ulong(0), ii_)), ctypes.sizeof(Input))
+_plans = {}
 
-    move_mouse_horizontal(KEY_DRAG_LEFT_PIXELS, duration=KEY_DRAG_TIME, steps=50)
 
-    ii_.mi = MouseInput(0, 0, 0, 0x0004, 0, ctypes.pointer(extra))
-    SendInput(1, ctypes.pointer(Input(ctypes.c_ulong(0), ii_)), ctypes.sizeof(Input))
-    print(">> THROW V2: DRAG COMPLETE")
+def get_plan(name, config):
+    """
+    Cached plan for a macro, compiled on first use and again whenever config
+    differs from the one the cached plan was compiled from (e.g. simulations)
+    """
+    plan = _plans.get(name)
+    if plan is None or plan.signature != plan_signature(config):
+        plan = _plans[name] = PLAN_COMPILERS[name](config)
+        print(f">> MACRO: Compiled {name} plan ({len(plan.steps)} steps)")
+    return plan
 
-    time.sleep(max(0.0, KEY_TAB_DELAY_AFTER_DRAG))
 
-    print(">> THROW V2: TAB PRESS")
-    ii_ = Input_I()
-    ii_.ki = KeyBdInput(TAB_KEYCODE, 0, 0, 0, ctypes.pointer(extra))
-    SendInput(1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input))
-    time.sleep(KEY_TAB_DWELL)
-    ii_.ki = KeyBdInput(TAB_KEYCODE, 0, 0x0002, 0, ctypes.pointer(extra))
-    SendInput(1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input))
+def warm_up_plans(config):
+    """Compile every plan ahead of the first trigger"""
+    for name in PLAN_COMPILERS:
+        get_plan(name, config)
 
-    time.sleep(POST_TAB_TAP_DELAY)
-    time.sleep(max(0.0, KEY_POST_TAB_TO_E_SPAM_DELAY))
 
-    print(">> THROW V2: E-SPAM START")
-    spam_start_time = time.perf_counter()
-    spam_end = spam_start_time + KEY_SPAM_DURATION
-    clumsy_deactivated = False
+def dump_plans(config):
+    """Dump every throw plan (compiling it if needed) for debugging"""
+    return "\n\n".join(get_plan(name, config).dump() for name in PLAN_COMPILERS)
 
-    while time.perf_counter() < spam_end:
-        ii_ = Input_I()
-        ii_.ki = KeyBdInput(E_KEYCODE, 0, 0, 0, ctypes.pointer(extra))
-        SendInput(
-            1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input)
-        )
-        time.sleep(KEY_E_DWELL)
-        ii_.ki = KeyBdInput(E_KEYCODE, 0, 0x0002, 0, ctypes.pointer(extra))
-        SendInput(
-            1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input)
-        )
 
-        if (
-            not clumsy_deactivated
-            and (time.perf_counter() - spam_start_time) >= CLUMSY_DEACTIVATE_AFTER_SPAM
-        ):
-            print(">> THROW V2: DEACTIVATING CLUMSY")
-            reconnect_net()
-            clumsy_deactivated = True
+def _invalidate_plans(config):
+    signature = plan_signature(config)
+    for name, plan in list(_plans.items()):
+        if plan.signature != signature:
+            del _plans[name]
+            print(f">> MACRO: {name} plan invalidated by config change")
+
+
+add_config_listener(_invalidate_plans)
+
+
+def _input_pair(target):
+    """Down/up callables for a ("key", key id) or ("vk", virtual key) target"""
+    kind, key = target
+    if kind == "key":
+        press_key = input_control.backend.press_key
+        release_key = input_control.backend.release_key
+        return (lambda: press_key(key)), (lambda: release_key(key))
+    send_key = input_control.backend.send_key
+    return (lambda: send_key(key)), (lambda: send_key(key, up=True))
+
+
+def execute_plan(plan, calls):
+    """
+    Run a compiled plan on absolute deadlines from now. calls maps the names
+    used by "call" steps to callables. Returns the Timeline. If the macro is
+    cancelled, held inputs are released and an open toggle is reverted.
+    """
+    # Backend-Funktionen einmal binden (kein Lookup pro Event)
+    backend = input_control.backend
+    press_key = backend.press_key
+    release_key = backend.release_key
+    press_button = backend.press_button
+    release_button = backend.release_button
+    send_key = backend.send_key
+    send_mouse = backend.send_mouse
+
+    timeline = Timeline(macro=plan.name)
+    held = set()
+    open_toggles = []
+    try:
+        for offset, label, kind, args, message in plan.steps:
+            timeline.at(offset, label)
+            if message:
+                print(message)
+
+            if kind == "key":
+                key, up = args
+                if up:
+                    release_key(key)
+                    held.discard(("key", key))
+                else:
+                    press_key(key)
+                    held.add(("key", key))
+            elif kind == "vk":
+                vk, up = args
+                send_key(vk, up)
+                if up:
+                    held.discard(("vk", vk))
+                else:
+                    held.add(("vk", vk))
+            elif kind == "button":
+                button, up = args
+                if up:
+                    release_button(button)
+                    held.discard(("button", button))
+                else:
+                    press_button(button)
+                    held.add(("button", button))
+            elif kind == "mouse":
+                send_mouse(*args)
+                action_type, button = MOUSE_FLAG_EVENTS[args[0]]
+                if action_type == "mouse_release":
+                    held.discard(("button", button))
+                else:
+                    held.add(("button", button))
+            elif kind == "drag":
+                distance, duration, drag_steps = args
+                move_mouse_horizontal(
+                    distance, duration, drag_steps, start=timeline.start + offset
+                )
+            elif kind == "call":
+                # Blocking step of unknown length: later deadlines slip by its overrun
+                calls[args[0]](*args[1:])
+                if plan.toggle_undo:
+                    open_toggles.append(plan.toggle_undo)
+                timeline.slip(offset, label)
+            elif kind == "burst":
+                held.add(("burst", args[1]))
+                _run_burst(timeline, offset, label, args, calls, open_toggles)
+                held.discard(("burst", args[1]))
+
+            if kind in INPUT_STEP_KINDS:
+                mark_first_input()
+    except MacroCancelled:
+        _cancel_cleanup(held, open_toggles, calls)
+        raise
+    return timeline
+
+
+def _run_burst(timeline, offset, label, args, calls, open_toggles):
+    burst, target, toggle_after, toggle = args
+    down, up = _input_pair(target)
+
+    def after(slot):
+        if open_toggles and slot + burst.hold - offset >= toggle_after:
+            open_toggles.clear()
+            calls[toggle[0]](*toggle[1:])
+
+    stats = burst.run(timeline, offset, down, up, after, label)
+    print(f">> {label.upper()}: {stats.summary()}")
+
+
+def _release_event(kind, target):
+    """Recording-style release event for one held plan input"""
+    if kind == "burst":
+        kind, target = target
+    if kind == "vk":
+        return ("key_release", f"vk:{target}", None, None)
+    if kind == "button":
+        return ("mouse_release", target, None, None)
+    return ("key_release", target, None, None)
+
+
+def _cancel_cleanup(held, open_toggles, calls):
+    """
+    Release whatever a cancelled plan still holds (as one group, a single
+    SendInput on Win32) and revert its toggle
+    """
+    if held:
+        events = [_release_event(kind, target) for kind, target in held]
+        backend = input_control.backend
+        backend.send_group(backend.prepare_group(events))
+    for toggle in open_toggles:
+        calls[toggle[0]](*toggle[1:])
+    open_toggles.clear()
 
-        time.sleep(KEY_E_PERIOD)
 
-    print(">> THROW V2: E-SPAM COMPLETE")
+def run_throw_macro(state):
+    if not state["config"].get("throw_enabled", True):
+        return
 
-    time.sleep(max(0.0, KEY_FINAL_SETTLE_DELAY))
+    plan = get_plan("throw", state["config"])
+    print(">> THROW MACRO: STARTING")
+    timeline = execute_plan(plan, {"clumsy": send_clumsy_hotkey})
 
-    print(f">> THROW MACRO V2: COMPLETE ({time.perf_counter() - start_time:.3f}s)")
+    # Abschluss-Log mit Gesamtdauer
+    print(
+        f">> THROW MACRO: COMPLETE ({timeline.total():.3f}s, " f"{timeline.summary()})"
+    )
+
+
+def run_throw_macro_v2(state, update_overlay, disconnect_net, reconnect_net):
+    """
+    Throw Macro Version 2 - Uses robust input methods from run_complex_macro
+    Sequence: Clumsy activate → Drag → Tab → E-spam → Clumsy deactivate
+    """
+    if not state["config"].get("throw_enabled", True):
+        return
+
+    plan = get_plan("throw_v2", state["config"])
+    print(">> THROW MACRO V2: STARTING")
+
+    def reconnect():
+        print(">> THROW V2: DEACTIVATING CLUMSY")
+        reconnect_net()
+
+    timeline = execute_plan(
+        plan, {"disconnect": disconnect_net, "reconnect": reconnect}
+    )
+
+    print(
+        f">> THROW MACRO V2: COMPLETE ({timeline.total():.3f}s, "
+        f"{timeline.summary()})"
+    )
 
 
 def run_complex_macro(state, update_overlay, disconnect_net, reconnect_net):
@@ -238,6 +454,7 @@ def run_complex_macro(state, update_overlay, disconnect_net, reconnect_net):
         return
     state["is_running_macro"] = True
     print(">> MACRO: STARTING TIMELINE")
+    start_time = timing.perf_counter()
     update_overlay()
 
     c = state["config"]
@@ -249,59 +466,68 @@ def run_complex_macro(state, update_overlay, disconnect_net, reconnect_net):
     spam_start = float(c.get("macro_spam_start"))
     spam_len = float(c.get("macro_spam_len"))
     cps = int(c.get("click_cps"))
+    duty = float(c.get("click_duty_cycle", 0.5))
+    catch_up = c.get("spam_catch_up", "skip")
 
-    def task_hold():
-        if hold_len <= 0:
-            return
+    send_mouse = input_control.backend.send_mouse
 
-        time.sleep(hold_start)
+    def hold_down():
         print(">> HOLD: DOWN")
-        extra = ctypes.c_ulong(0)
-        ii_ = Input_I()
-        ii_.mi = MouseInput(0, 0, 0, 0x0002, 0, ctypes.pointer(extra))
-        SendInput(
-            1, ctypes.pointer(Input(ctypes.c_ulong(0), ii_)), ctypes.sizeof(Input)
-        )
-        time.sleep(hold_len)
-        print(">> HOLD: RELEASE")
-        ii_.mi = MouseInput(0, 0, 0, 0x0004, 0, ctypes.pointer(extra))
-        SendInput(
-            1, ctypes.pointer(Input(ctypes.c_ulong(0), ii_)), ctypes.sizeof(Input)
-        )
+        send_mouse(MOUSEEVENTF_LEFTDOWN)
+        mark_first_input()
 
-    def task_net():
-        if net_len <= 0:
-            return
-        time.sleep(net_start)
-        disconnect_net()
-        time.sleep(net_len)
-        reconnect_net()
+    def click_down():
+        send_mouse(MOUSEEVENTF_LEFTDOWN)
+        mark_first_input()
 
-    def task_spam():
-        if spam_len <= 0:
-            return
-        time.sleep(spam_start)
-        print(">> SPAM: START")
-        end_t = time.time() + spam_len
-        interval = 1.0 / cps
-        while time.time() < end_t:
-            click_mouse_fast()
-            time.sleep(max(0, interval - 0.03))
-        print(">> SPAM: END")
-
-    t1 = threading.Thread(target=task_hold)
-    t2 = threading.Thread(target=task_net)
-    t3 = threading.Thread(target=task_spam)
-    t1.start()
-    t2.start()
-    t3.start()
-
-    def waiter():
-        t1.join()
-        t2.join()
-        t3.join()
+    def hold_release():
+        print(">> HOLD: RELEASE")
+        send_mouse(MOUSEEVENTF_LEFTUP)
+
+    # Merge the hold/net/spam lanes into one heap on the macro start clock
+    timeline = Timeline(start_time, "macro")
+    hold_lane = []
+    if hold_len > 0:
+        hold_lane = [
+            (hold_start, "hold down", hold_down, False),
+            (hold_start + hold_len, "hold release", hold_release, False),
+        ]
+
+    # Network toggles block, so they run on the side executor
+    net_lane = []
+    if net_len > 0:
+        net_lane = [
+            (net_start, "net disconnect", disconnect_net, True),
+            (net_start + net_len, "net reconnect", reconnect_net, True),
+        ]
+
+    spam_lane = []
+    spam_stats = None
+    if spam_len > 0:
+        clicks = PeriodicBurst(cps, duty, spam_len, catch_up)
+        # Clicks are planned one at a time, so spam_catch_up applies here too
+        click_lane, spam_stats = clicks.events(
+            spam_start,
+            click_down,
+            lambda: send_mouse(MOUSEEVENTF_LEFTUP),
+            timeline,
+            "spam click",
+        )
+        spam_lane = [(spam_start, "spam start", lambda: print(">> SPAM: START"), False)]
+        spam_lane += click_lane
+
+    try:
+        run_heap(merge_lanes(hold_lane, net_lane, spam_lane), timeline)
+    except MacroCancelled:
+        # Release the hold/last click; reconnect_net skips if not lagging
+        send_mouse(MOUSEEVENTF_LEFTUP)
+        if net_len > 0:
+            reconnect_net()
+        raise
+    finally:
         state["is_running_macro"] = False
-        print(">> MACRO: FINISHED")
         update_overlay()
 
-    threading.Thread(target=waiter).start()
+    if spam_stats is not None:
+        print(f">> SPAM: END ({spam_stats.summary()})")
+    print(f">> MACRO: FINISHED ({timeline.summary()})")
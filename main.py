@@ -1,3 +1,8 @@
+import time
+
+# Process start for the startup breakdown, taken before the heavy imports
+PROCESS_START = time.perf_counter()
+
 import sys
 import subprocess
 import tkinter as tk
@@ -36,6 +41,8 @@ from pynput import keyboard
 from pynput.mouse import Listener as MouseListener
 
 from config import state, load_config, save_config, check_config_reload
+from input_control import create_backend, set_backend
+from timing import StartupTimer, calibrate_spin_threshold
 from network import (
     run_as_admin,
     auto_detect_interface,
@@ -44,39 +51,62 @@ from network import (
     reconnect_net,
 )
 from recording import (
-    load_recording,
+    preload_recording,
     start_recording,
     stop_recording,
     record_action,
     playback_recording,
 )
-from macros import run_complex_macro, run_throw_macro, run_throw_macro_v2
+from macros import (
+    run_complex_macro,
+    run_throw_macro,
+    run_throw_macro_v2,
+    warm_up_plans,
+)
+from executor import start_executor
+from hookqueue import (
+    CLICK_ARITY,
+    DEFAULT_QUEUE_SIZE,
+    KEY_ARITY,
+    MOVE_ARITY,
+    DynamicListener,
+    HookConsumer,
+)
 from gui import App, update_overlay
 from hotkeys import on_key_press, on_key_release, on_mouse_click, on_mouse_move
 
 
+# Global mouse hook, attached only while recording (set up in __main__)
+mouse_listener = None
+
+# How often the GUI picks up a new trigger-to-input latency for the overlay
+LATENCY_POLL_MS = 100
+
+
+def refresh_overlay():
+    update_overlay(state)
+
+
 def create_disconnect_net_wrapper():
     def wrapper():
-        disconnect_net(state, lambda: update_overlay(state))
+        disconnect_net(state, refresh_overlay)
 
     return wrapper
 
 
 def create_reconnect_net_wrapper():
     def wrapper():
-        reconnect_net(state, lambda: update_overlay(state))
+        reconnect_net(state, refresh_overlay)
 
     return wrapper
 
 
 def create_run_complex_macro_wrapper():
+    disconnect = create_disconnect_net_wrapper()
+    reconnect = create_reconnect_net_wrapper()
+
     def wrapper():
-        run_complex_macro(
-            state,
-            lambda: update_overlay(state),
-            create_disconnect_net_wrapper(),
-            create_reconnect_net_wrapper(),
-        )
+        run_complex_macro(state, refresh_overlay, disconnect, reconnect)
 
     return wrapper
 
@@ -89,27 +119,28 @@ def create_run_throw_macro_wrapper():
 
 
 def create_run_throw_macro_v2_wrapper():
+    disconnect = create_disconnect_net_wrapper()
+    reconnect = create_reconnect_net_wrapper()
+
     def wrapper():
-        run_throw_macro_v2(
-            state,
-            lambda: update_overlay(state),
-            create_disconnect_net_wrapper(),
-            create_reconnect_net_wrapper(),
-        )
+        run_throw_macro_v2(state, refresh_overlay, disconnect, reconnect)
 
     return wrapper
 
 
 def create_start_recording_wrapper():
     def wrapper():
-        start_recording(state, lambda: update_overlay(state))
+        start_recording(state, refresh_overlay)
+        if state["is_recording"]:
+            mouse_listener.attach()
 
     return wrapper
 
 
 def create_stop_recording_wrapper():
     def wrapper():
-        stop_recording(state, lambda: update_overlay(state))
+        stop_recording(state, refresh_overlay)
+        mouse_listener.detach()
 
     return wrapper
 
@@ -129,39 +160,54 @@ def create_record_action_wrapper():
 
 
 def create_on_key_press_wrapper():
-    def wrapper(key):
+    run_macro = create_run_complex_macro_wrapper()
+    run_throw = create_run_throw_macro_wrapper()
+    run_throw_v2 = create_run_throw_macro_v2_wrapper()
+    start = create_start_recording_wrapper()
+    stop = create_stop_recording_wrapper()
+    playback = create_playback_recording_wrapper()
+    record = create_record_action_wrapper()
+
+    def wrapper(key, at=None):
         on_key_press(
             key,
             state,
-            create_run_complex_macro_wrapper(),
-            create_run_throw_macro_wrapper(),
-            create_run_throw_macro_v2_wrapper(),
-            create_start_recording_wrapper(),
-            create_stop_recording_wrapper(),
-            create_playback_recording_wrapper(),
-            create_record_action_wrapper(),
+            run_macro,
+            run_throw,
+            run_throw_v2,
+            start,
+            stop,
+            playback,
+            record,
+            at,
         )
 
     return wrapper
 
 
 def create_on_key_release_wrapper():
-    def wrapper(key):
-        on_key_release(key, state, create_record_action_wrapper())
+    record = create_record_action_wrapper()
+
+    def wrapper(key, at=None):
+        on_key_release(key, state, record, at)
 
     return wrapper
 
 
 def create_on_mouse_click_wrapper():
-    def wrapper(x, y, button, pressed):
-        on_mouse_click(x, y, button, pressed, state, create_record_action_wrapper())
+    record = create_record_action_wrapper()
+
+    def wrapper(x, y, button, pressed, at=None):
+        on_mouse_click(x, y, button, pressed, state, record, at)
 
     return wrapper
 
 
 def create_on_mouse_move_wrapper():
-    def wrapper(x, y):
-        on_mouse_move(x, y, state, create_record_action_wrapper())
+    record = create_record_action_wrapper()
+
+    def wrapper(x, y, at=None):
+        on_mouse_move(x, y, state, record, at)
 
     return wrapper
 
@@ -170,29 +216,68 @@ if __name__ == "__main__":
     if not run_as_admin():
         sys.exit(0)
 
+    startup = StartupTimer(PROCESS_START)
+    startup.mark("imports")
     load_config()
-    load_recording(state)
+    set_backend(create_backend(state["config"].get("input_backend", "auto")))
+    startup.mark("config and input backend")
+
+    def calibrate():
+        started = time.perf_counter()
+        calibrate_spin_threshold()
+        startup.mark("spin threshold calibrated (executor)", started)
+
+    # Calibration and plan warm-up run on a warm-up thread, ahead of any macro
+    start_executor(calibrate, lambda: warm_up_plans(state["config"]))
+    startup.mark("executor started")
+
+    # Hooks only timestamp and queue; the consumer thread does the real work
+    hooks = HookConsumer(state["config"].get("hook_queue_size", DEFAULT_QUEUE_SIZE))
+    state["hook_consumer"] = hooks
+    keyboard_events = hooks.add_queue("keyboard")
+    mouse_events = hooks.add_queue("mouse")
+
+    # Callbacks are built once here and reused, so the listener hooks allocate
+    # no closures per event. No binding uses the mouse, so its hook only runs
+    # while recording
+    on_click = mouse_events.hook(create_on_mouse_click_wrapper(), CLICK_ARITY)
+    on_move = mouse_events.hook(create_on_mouse_move_wrapper(), MOVE_ARITY)
+    mouse_listener = DynamicListener(
+        "mouse", lambda: MouseListener(on_click=on_click, on_move=on_move)
+    )
+
+    keyboard.Listener(
+        on_press=keyboard_events.hook(create_on_key_press_wrapper(), KEY_ARITY),
+        on_release=keyboard_events.hook(create_on_key_release_wrapper(), KEY_ARITY),
+    ).start()
+    startup.mark("hotkeys registered")
+
+    # Playback parses on demand if it is triggered before this finishes
+    preload_recording(
+        state, lambda started: startup.mark("recording preloaded (background)", started)
+    )
 
     if state["config"]["net_interface"] == "Auto-Detect":
         interface_name, interface_type = auto_detect_interface()
         state["config"]["net_interface"] = interface_name
         state["config"]["net_interface_type"] = interface_type
-
-    keyboard.Listener(
-        on_press=create_on_key_press_wrapper(),
-        on_release=create_on_key_release_wrapper(),
-    ).start()
-
-    MouseListener(
-        on_click=create_on_mouse_click_wrapper(), on_move=create_on_mouse_move_wrapper()
-    ).start()
+        startup.mark("network interface detected")
 
     app = App(state, save_config, get_active_network_interfaces)
+    startup.mark("window built")
+    app.after_idle(lambda: startup.mark("window shown"))
 
     def check_reload():
         if check_config_reload():
             print(">> CONFIG: Configuration reloaded!")
+        app.sync_recordings()
         app.after(1000, check_reload)
 
+    # Throw V1 and playback never redraw the overlay themselves
+    def check_latency():
+        app.sync_latency()
+        app.after(LATENCY_POLL_MS, check_latency)
+
     app.after(1000, check_reload)
+    app.after(LATENCY_POLL_MS, check_latency)
     app.mainloop()
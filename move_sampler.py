@@ -0,0 +1,101 @@
+DEFAULT_TOLERANCE_PX = 2.0
+DEFAULT_MAX_RATE = 125.0
+DEFAULT_MAX_GAP_MS = 50.0
+
+
+class MoveSampler:
+    """
+    Adaptive sampling of mouse moves while recording. The moves since the
+    last kept one are buffered as long as a straight segment from that kept
+    move to the newest one, walked at constant speed, passes within
+    tolerance pixels of every buffered move at its own time. Turns, speed
+    changes and the start of a motion break that and keep the last move
+    before the break; straight stretches keep nothing until max_gap, and
+    while the cursor rests within tolerance nothing is kept at all. Kept
+    moves are at most max_rate per second. Times are hook
+    perf_counter timestamps, the same clock record_action uses.
+    """
+
+    def __init__(
+        self,
+        tolerance=DEFAULT_TOLERANCE_PX,
+        max_rate=DEFAULT_MAX_RATE,
+        max_gap_ms=DEFAULT_MAX_GAP_MS,
+    ):
+        self.tolerance_sq = tolerance * tolerance
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.max_gap = max_gap_ms / 1000
+        self.anchor = None
+        self.buffer = []
+        self.seen = 0
+        self.kept = 0
+
+    def _fits(self, at, x, y):
+        """Can the segment anchor -> (at, x, y) stand in for every buffered move?"""
+        anchor_at, anchor_x, anchor_y = self.anchor
+        span = at - anchor_at
+        if span > self.max_gap:
+            return False
+        dx, dy = x - anchor_x, y - anchor_y
+        tolerance_sq = self.tolerance_sq
+        for t, bx, by in self.buffer:
+            r = (t - anchor_at) / span if span > 0 else 0.0
+            ex = bx - anchor_x - r * dx
+            ey = by - anchor_y - r * dy
+            if ex * ex + ey * ey > tolerance_sq:
+                return False
+        return True
+
+    def _resting(self):
+        """Are all buffered moves within tolerance of the kept one?"""
+        _, anchor_x, anchor_y = self.anchor
+        tolerance_sq = self.tolerance_sq
+        for _, bx, by in self.buffer:
+            ex, ey = bx - anchor_x, by - anchor_y
+            if ex * ex + ey * ey > tolerance_sq:
+                return False
+        return True
+
+    def add(self, x, y, at):
+        """
+        Feed one move seen at perf_counter time at. Returns the (x, y, at) move
+        to record now - usually an earlier, buffered one - or None.
+        """
+        self.seen += 1
+        move = (at, x, y)
+        if self.anchor is None:
+            return self._keep(move)
+
+        if not self.buffer or self._fits(at, x, y):
+            self.buffer.append(move)
+            return None
+
+        last = self.buffer[-1]
+        if self._resting():
+            # Cursor stayed put: slide the kept move forward, nothing to record
+            self.anchor = (last[0], self.anchor[1], self.anchor[2])
+            self.buffer = [move]
+            return None
+        if last[0] - self.anchor[0] < self.min_interval:
+            # Rate limit: keep buffering, a later move gets kept instead
+            self.buffer.append(move)
+            return None
+        kept = self._keep(last)
+        self.buffer.append(move)
+        return kept
+
+    def take_pending(self):
+        """
+        Keep and return the newest buffered move (or None), for when nothing
+        may stay buffered: before a click and when the recording stops
+        """
+        if not self.buffer:
+            return None
+        return self._keep(self.buffer[-1])
+
+    def _keep(self, move):
+        self.anchor = move
+        self.buffer = []
+        self.kept += 1
+        at, x, y = move
+        return x, y, at
@@ -3,7 +3,8 @@ import sys
 import ctypes
 import re
 import psutil
-import time
+import telemetry
+import timing
 
 
 def is_admin():
@@ -144,6 +145,8 @@ def auto_detect_interface():
 
 
 def get_current_wifi_profile():
+    if timing.get_clock().simulated:
+        return None
     try:
         res = subprocess.run(
             ["netsh", "wlan", "show", "interfaces"], capture_output=True, text=True
@@ -161,13 +164,33 @@ def get_current_wifi_profile():
     return None
 
 
+def _netsh(args):
+    """Run a netsh command and wait for it; only logged on a simulated clock"""
+    clock = timing.get_clock()
+    if clock.simulated:
+        clock.log("netsh", " ".join(args))
+        return subprocess.CompletedProcess(args, 0, "", "")
+    return subprocess.run(args, capture_output=True, text=True)
+
+
+def _netsh_async(args):
+    """Start a netsh command without waiting; only logged on a simulated clock"""
+    clock = timing.get_clock()
+    if clock.simulated:
+        clock.log("netsh", " ".join(args))
+        return None
+    return subprocess.Popen(args)
+
+
 def send_clumsy_hotkey(key_char):
     """Send a keyboard key press to trigger Clumsy"""
-    from input_control import Input, Input_I, KeyBdInput, SendInput
+    import input_control
+    from input_control import VK_SHIFT
+
+    send_key = input_control.backend.send_key
 
     try:
-        VkKeyScan = ctypes.windll.user32.VkKeyScanA
-        result = VkKeyScan(ord(key_char))
+        result = input_control.backend.char_to_vk(key_char)
 
         if result == -1:
             print(f"!! ERROR: Cannot map character '{key_char}' to virtual key")
@@ -176,36 +199,22 @@ def send_clumsy_hotkey(key_char):
         vk = result & 0xFF
         shift_state = (result >> 8) & 0xFF
 
-        extra = ctypes.c_ulong(0)
-
         if shift_state & 1:
-            ii_ = Input_I()
-            ii_.ki = KeyBdInput(0x10, 0, 0, 0, ctypes.pointer(extra))
-            SendInput(
-                1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input)
-            )
-            time.sleep(0.02)
+            send_key(VK_SHIFT)
+            telemetry.mark_first_input()
+            timing.sleep(0.02)
 
-        ii_ = Input_I()
-        ii_.ki = KeyBdInput(vk, 0, 0, 0, ctypes.pointer(extra))
-        SendInput(
-            1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input)
-        )
-        time.sleep(0.1)
+        send_key(vk)
+        telemetry.mark_first_input()
+        timing.sleep(0.1)
 
-        ii_.ki = KeyBdInput(vk, 0, 0x0002, 0, ctypes.pointer(extra))
-        SendInput(
-            1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input)
-        )
+        send_key(vk, up=True)
 
         if shift_state & 1:
-            time.sleep(0.02)
-            ii_.ki = KeyBdInput(0x10, 0, 0x0002, 0, ctypes.pointer(extra))
-            SendInput(
-                1, ctypes.pointer(Input(ctypes.c_ulong(1), ii_)), ctypes.sizeof(Input)
-            )
+            timing.sleep(0.02)
+            send_key(VK_SHIFT, up=True)
 
-        time.sleep(0.05)
+        timing.sleep(0.05)
         return True
     except Exception as e:
         print(f"!! ERROR sending Clumsy hotkey: {e}")
@@ -226,7 +235,7 @@ def disconnect_net(state, update_overlay):
         success = send_clumsy_hotkey(hotkey)
         if success:
             print(">> CLUMSY: Toggle-Signal send (should now be active)")
-            time.sleep(0.15)
+            timing.sleep(0.15)
             return
 
     else:
@@ -247,37 +256,21 @@ def disconnect_net(state, update_overlay):
                 state["wifi_profile"] = profile
 
             print(f">> DISCONNECTING WiFi: {iface}")
-            res = subprocess.run(
-                ["netsh", "wlan", "disconnect", f"interface={iface}"],
-                capture_output=True,
-                text=True,
-            )
+            res = _netsh(["netsh", "wlan", "disconnect", f"interface={iface}"])
             if res.returncode != 0:
                 print(f"!! ERROR: {res.stderr.strip() or res.stdout.strip()}")
 
         elif iface_type == "Ethernet":
             print(f">> DISABLING Ethernet: {iface}")
-            res = subprocess.run(
-                ["netsh", "interface", "set", "interface", iface, "disable"],
-                capture_output=True,
-                text=True,
-            )
+            res = _netsh(["netsh", "interface", "set", "interface", iface, "disable"])
             if res.returncode != 0:
                 print(f"!! ERROR: {res.stderr.strip() or res.stdout.strip()}")
 
         else:
             print(f">> DISCONNECTING Unknown interface: {iface}")
-            res = subprocess.run(
-                ["netsh", "wlan", "disconnect", f"interface={iface}"],
-                capture_output=True,
-                text=True,
-            )
+            res = _netsh(["netsh", "wlan", "disconnect", f"interface={iface}"])
             if res.returncode != 0:
-                subprocess.run(
-                    ["netsh", "interface", "set", "interface", iface, "disable"],
-                    capture_output=True,
-                    text=True,
-                )
+                _netsh(["netsh", "interface", "set", "interface", iface, "disable"])
 
     update_overlay()
 
@@ -292,7 +285,7 @@ def reconnect_net(state, update_overlay):
     if method == "Clumsy":
         hotkey = state["config"].get("clumsy_hotkey", "[")
         print(f">> DEACTIVATING CLUMSY (Hotkey: {hotkey})")
-        time.sleep(0.1)
+        timing.sleep(0.1)
         success = send_clumsy_hotkey(hotkey)
         state["is_lagging"] = False
         update_overlay()
@@ -318,7 +311,7 @@ def reconnect_net(state, update_overlay):
             if prof:
                 try:
                     prof = sanitize_interface_name(prof)
-                    subprocess.Popen(
+                    _netsh_async(
                         [
                             "netsh",
                             "wlan",
@@ -329,15 +322,13 @@ def reconnect_net(state, update_overlay):
                     )
                 except ValueError as e:
                     print(f"!! ERROR: Invalid profile name: {e}")
-                    subprocess.Popen(["netsh", "wlan", "connect", f"interface={iface}"])
+                    _netsh_async(["netsh", "wlan", "connect", f"interface={iface}"])
             else:
-                subprocess.Popen(["netsh", "wlan", "connect", f"interface={iface}"])
+                _netsh_async(["netsh", "wlan", "connect", f"interface={iface}"])
 
         elif iface_type == "Ethernet":
             print(f">> RE-ENABLING Ethernet: {iface}")
-            subprocess.Popen(
-                ["netsh", "interface", "set", "interface", iface, "enable"]
-            )
+            _netsh_async(["netsh", "interface", "set", "interface", iface, "enable"])
 
         else:
             prof = state.get("wifi_profile")
@@ -346,7 +337,7 @@ def reconnect_net(state, update_overlay):
             if prof:
                 try:
                     prof = sanitize_interface_name(prof)
-                    subprocess.Popen(
+                    _netsh_async(
                         [
                             "netsh",
                             "wlan",
@@ -356,11 +347,11 @@ def reconnect_net(state, update_overlay):
                         ]
                     )
                 except ValueError:
-                    subprocess.Popen(
+                    _netsh_async(
                         ["netsh", "interface", "set", "interface", iface, "enable"]
                     )
             else:
-                subprocess.Popen(
+                _netsh_async(
                     ["netsh", "interface", "set", "interface", iface, "enable"]
                 )
 
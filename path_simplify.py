@@ -0,0 +1,135 @@
+from array import array
+from itertools import compress
+
+from recording_store import MOUSE_MOVE, Recording
+
+SIMPLIFY_MODES = ("off", "save", "playback")
+DEFAULT_TOLERANCE_PX = 2.0
+DEFAULT_MAX_GAP_MS = 100.0
+
+
+def _simplify_run(times, xs, ys, first, last, tolerance, max_gap, keep):
+    """
+    Ramer-Douglas-Peucker over one run of mouse moves (first..last kept).
+    The error of a move is its distance to where the straight segment puts
+    the cursor at that move's time (synchronized distance), so timing counts
+    as much as shape. Segments longer than max_gap seconds are split too,
+    so kept moves are never further apart than that.
+    """
+    tolerance_sq = tolerance * tolerance
+    stack = [(first, last)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        ta, xa, ya = times[a], xs[a], ys[a]
+        span = times[b] - ta
+        dx, dy = xs[b] - xa, ys[b] - ya
+
+        worst = -1.0
+        split = (a + b) // 2
+        for i in range(a + 1, b):
+            r = (times[i] - ta) / span if span > 0 else 0.0
+            ex = xs[i] - (xa + r * dx)
+            ey = ys[i] - (ya + r * dy)
+            error = ex * ex + ey * ey
+            if error > worst:
+                worst, split = error, i
+
+        if worst <= tolerance_sq and span > max_gap:
+            # Shape is fine, only too long: cut at the furthest move within max_gap
+            split = a + 1
+            while split + 1 < b and times[split + 1] - ta <= max_gap:
+                split += 1
+        if worst > tolerance_sq or span > max_gap:
+            stack.append((a, split))
+            stack.append((split, b))
+        else:
+            for i in range(a + 1, b):
+                keep[i] = 0
+
+
+def simplify_mouse_path(
+    recording, tolerance_px=DEFAULT_TOLERANCE_PX, max_gap_ms=DEFAULT_MAX_GAP_MS
+):
+    """
+    Drop mouse moves the path can do without: returns (Recording, removed).
+    Only runs of consecutive moves are simplified; their first and last move
+    and every other event are kept, so clicks and keys land where they did.
+    """
+    count = len(recording)
+    keep = bytearray(b"\x01") * count
+    types = recording.types
+    max_gap = max_gap_ms / 1000
+
+    first = None
+    for i in range(count + 1):
+        if i < count and types[i] == MOUSE_MOVE:
+            if first is None:
+                first = i
+            continue
+        if first is not None and i - 1 - first >= 2:
+            _simplify_run(
+                recording.times,
+                recording.xs,
+                recording.ys,
+                first,
+                i - 1,
+                tolerance_px,
+                max_gap,
+                keep,
+            )
+        first = None
+
+    removed = count - sum(keep)
+    if not removed:
+        return recording, 0
+    simplified = Recording.from_columns(
+        *(
+            array(column.typecode, compress(column, keep))
+            for column in (
+                recording.times,
+                recording.types,
+                recording.codes,
+                recording.xs,
+                recording.ys,
+            )
+        ),
+        recording.symbols[1:],
+    )
+    return simplified, removed
+
+
+# (source recording, tolerances, result) of the last playback simplification
+_last_playback = None
+
+
+def simplify_for(config, recording, mode):
+    """
+    simplify_mouse_path() with the config tolerances if path_simplify_mode is
+    mode ("save" or "playback"), logging what was removed. Replaying the same
+    recording reuses the previous result.
+    """
+    global _last_playback
+    if config.get("path_simplify_mode", "off") != mode:
+        return recording
+    tolerance_px = float(config.get("path_simplify_px", DEFAULT_TOLERANCE_PX))
+    max_gap_ms = float(config.get("path_simplify_max_gap_ms", DEFAULT_MAX_GAP_MS))
+    cached = _last_playback
+    if (
+        mode == "playback"
+        and cached is not None
+        and cached[0] is recording
+        and cached[1] == (tolerance_px, max_gap_ms)
+    ):
+        return cached[2]
+
+    simplified, removed = simplify_mouse_path(recording, tolerance_px, max_gap_ms)
+    if mode == "playback":
+        _last_playback = (recording, (tolerance_px, max_gap_ms), simplified)
+    moves = recording.types.count(MOUSE_MOVE)
+    print(
+        f">> SIMPLIFY: Removed {removed} of {moves} mouse moves "
+        f"(within {tolerance_px:g} px, gaps <= {max_gap_ms:g} ms)"
+    )
+    return simplified
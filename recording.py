@@ -1,12 +1,48 @@
 import os
+import threading
 import time
 import csv
 from datetime import datetime
-from pynput import keyboard
-from pynput.mouse import Button
-from input_control import keyboard_controller, mouse
+import input_control
+from input_control import key_id, button_name
+import telemetry
+import timing
+from telemetry import mark_first_input
+from timing import MacroCancelled, wait_until
+from recording_writer import CSV_HEADER, RecordingWriter, recover_partial_recordings
+from move_sampler import (
+    DEFAULT_MAX_GAP_MS,
+    DEFAULT_MAX_RATE,
+    DEFAULT_TOLERANCE_PX,
+    MoveSampler,
+)
+from path_simplify import simplify_for
+from recording_catalog import RecordingCatalog
+from recording_format import RECORDING_EXT, read_binary, write_binary
+from recording_store import (
+    EVENT_TYPES,
+    KEY_RELEASE,
+    MOUSE_PRESS,
+    MOUSE_RELEASE,
+    NO_POSITION,
+    TYPE_CODES,
+    Recording,
+)
+
+try:
+    from pynput import keyboard
+    from pynput.mouse import Button
+except ImportError:
+    # Headless: keys and buttons stay as their string identities
+    keyboard = Button = None
 
 RECORDINGS_DIR = "recordings"
+# Held while a recording is selected or parsed (playback vs. the preload thread)
+_load_lock = threading.RLock()
+# Events closer than this to the first one of a group are sent together
+DEFAULT_GROUP_WINDOW = 0.001
+# Newer binary recordings first; CSV recordings keep loading as before
+RECORDING_EXTENSIONS = (RECORDING_EXT, ".csv")
 
 
 def get_recordings_folder():
@@ -18,19 +54,13 @@ def get_recordings_folder():
 
 def key_to_string(key):
     """Convert pynput key to string representation"""
-    if isinstance(key, keyboard.KeyCode):
-        if key.char:
-            return f"char:{key.char}"
-        else:
-            return f"vk:{key.vk}"
-    elif isinstance(key, keyboard.Key):
-        return f"Key.{key.name}"
-    else:
-        return str(key)
+    return key_id(key)
 
 
 def string_to_key(key_str):
     """Convert string representation back to pynput key"""
+    if keyboard is None:
+        return key_str if key_str.startswith(("char:", "vk:", "Key.")) else None
     if key_str.startswith("char:"):
         return keyboard.KeyCode.from_char(key_str[5:])
     elif key_str.startswith("vk:"):
@@ -43,63 +73,97 @@ def string_to_key(key_str):
 
 def button_to_string(button):
     """Convert mouse button to string"""
-    if button == Button.left:
-        return "left"
-    elif button == Button.right:
-        return "right"
-    elif button == Button.middle:
-        return "middle"
-    else:
-        return str(button)
+    return button_name(button)
 
 
 def string_to_button(button_str):
     """Convert string to mouse button"""
-    if button_str == "left":
-        return Button.left
-    elif button_str == "right":
-        return Button.right
-    elif button_str == "middle":
-        return Button.middle
-    return Button.left
+    if button_str not in ("left", "right", "middle"):
+        button_str = "left"
+    if Button is None:
+        return button_str
+    return Button[button_str]
+
+
+def new_recording_filename(extension=RECORDING_EXT):
+    """Timestamped recording path in the recordings folder"""
+    get_recordings_folder()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(RECORDINGS_DIR, f"recording_{timestamp}{extension}")
+
+
+def recover_recordings():
+    """Finish recordings that were still streaming when the app crashed"""
+    return recover_partial_recordings(get_recordings_folder())
+
+
+def encode_action(action_type, timestamp, key=None, button=None, x="", y=""):
+    """One CSV row (time, type, key, button, x, y) for a recorded event"""
+    return (
+        timestamp,
+        action_type,
+        "" if key is None else key_to_string(key),
+        "" if button is None else button_to_string(button),
+        x,
+        y,
+    )
+
+
+def as_recording(actions):
+    """Recording for state["recorded_actions"], converting a legacy list of dicts"""
+    if isinstance(actions, Recording):
+        return actions
+    return Recording.from_actions(actions or (), key_to_string, button_to_string)
+
+
+def write_recording_csv(recording, filename):
+    """Write a Recording as CSV (time, type, key, button, x, y)"""
+    symbols = recording.symbols
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+
+        for time_val, type_code, code, x, y in zip(
+            recording.times,
+            recording.types,
+            recording.codes,
+            recording.xs,
+            recording.ys,
+        ):
+            symbol = symbols[code] or ""
+            is_key = type_code <= KEY_RELEASE
+            writer.writerow(
+                [
+                    time_val,
+                    EVENT_TYPES[type_code],
+                    symbol if is_key else "",
+                    "" if is_key else symbol,
+                    "" if x == NO_POSITION else x,
+                    "" if y == NO_POSITION else y,
+                ]
+            )
 
 
 def save_recording(state):
-    """Save recorded actions to CSV file with timestamp"""
-    if not state["recorded_actions"]:
+    """Save recorded actions to a binary recording file with timestamp"""
+    recording = as_recording(state["recorded_actions"])
+    if not recording:
         print(">> SAVE: No recording to save")
         return False
 
     try:
-        get_recordings_folder()
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(RECORDINGS_DIR, f"recording_{timestamp}.csv")
-
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["time", "type", "key", "button", "x", "y"])
-
-            for action in state["recorded_actions"]:
-                time_val = action.get("time", 0)
-                action_type = action.get("type", "")
-
-                key_val = ""
-                if "key" in action:
-                    key_val = key_to_string(action["key"])
-
-                button_val = ""
-                if "button" in action:
-                    button_val = button_to_string(action["button"])
-
-                x_val = action.get("x", "")
-                y_val = action.get("y", "")
-
-                writer.writerow(
-                    [time_val, action_type, key_val, button_val, x_val, y_val]
-                )
+        recording = simplify_for(state["config"], recording, "save")
+        filename = new_recording_filename()
+        try:
+            write_binary(recording, filename)
+        except ValueError as e:
+            # Werte passen nicht ins Binaerformat: als CSV speichern
+            print(f">> SAVE: {e}, saving as CSV")
+            filename = new_recording_filename(".csv")
+            write_recording_csv(recording, filename)
 
         state["last_recording_file"] = filename
+        get_recording_catalog().update(filename, recording)
         print(f">> SAVE: Recording saved to {filename}")
         return True
     except Exception as e:
@@ -107,59 +171,227 @@ def save_recording(state):
         return False
 
 
-def load_recording(state, filename=None):
-    """Load recorded actions from CSV file"""
-    if filename is None:
-        filename = state.get("last_recording_file")
+def read_recording_csv(filename):
+    """Parse a recording CSV straight into a Recording"""
+    recording = Recording()
+    append = recording.append
+    # Key/button strings are validated once per distinct value
+    valid_keys = {}
+
+    with open(filename, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+
+        for row in reader:
+            time_val, action_type, key_str, button_str, x_val, y_val = row
+            type_code = TYPE_CODES.get(action_type)
+            if type_code is None:
+                continue
+
+            symbol = None
+            if key_str:
+                valid = valid_keys.get(key_str)
+                if valid is None:
+                    valid = valid_keys[key_str] = string_to_key(key_str) is not None
+                if valid:
+                    symbol = key_str
+            elif button_str:
+                symbol = button_to_string(string_to_button(button_str))
+
+            append(
+                float(time_val),
+                type_code,
+                symbol,
+                int(x_val) if x_val else None,
+                int(y_val) if y_val else None,
+            )
+    return recording
+
+
+def read_recording(filename):
+    """Recording from a .mrec or .csv file"""
+    if filename.endswith(RECORDING_EXT):
+        return read_binary(filename)
+    return read_recording_csv(filename)
+
+
+def import_csv_recording(filename):
+    """Convert a CSV recording to the binary format next to it, returns the new path"""
+    recording = read_recording_csv(filename)
+    binary_filename = os.path.splitext(filename)[0] + RECORDING_EXT
+    size = write_binary(recording, binary_filename)
+    get_recording_catalog().update(binary_filename, recording)
+    print(
+        f">> RECORDING: {os.path.basename(filename)} -> "
+        f"{os.path.basename(binary_filename)} ({len(recording)} actions, "
+        f"{os.path.getsize(filename)} -> {size} bytes)"
+    )
+    return binary_filename
+
 
-    if not filename or not os.path.exists(filename):
-        recordings_dir = get_recordings_folder()
-        recordings = [f for f in os.listdir(recordings_dir) if f.endswith(".csv")]
-        if not recordings:
+def export_csv_recording(filename):
+    """Write a binary recording out as CSV next to it, returns the new path"""
+    recording = read_binary(filename)
+    csv_filename = os.path.splitext(filename)[0] + ".csv"
+    write_recording_csv(recording, csv_filename)
+    get_recording_catalog().update(csv_filename, recording)
+    print(
+        f">> RECORDING: {os.path.basename(filename)} -> "
+        f"{os.path.basename(csv_filename)} ({len(recording)} actions)"
+    )
+    return csv_filename
+
+
+def load_recording(state, filename=None):
+    """Load recorded actions from a .mrec or CSV recording file"""
+    with _load_lock:
+        if filename is None:
+            filename = state.get("last_recording_file")
+
+        if not filename or not os.path.exists(filename):
+            recordings = get_available_recordings()
+            if not recordings:
+                return False
+            filename = recordings[0]
+
+        try:
+            state["recorded_actions"] = read_recording(filename)
+            state["last_recording_file"] = filename
+            print(
+                f">> LOAD: Recording loaded from {os.path.basename(filename)} ({len(state['recorded_actions'])} actions)"
+            )
+            return True
+        except Exception as e:
+            state["recorded_actions"] = Recording()
+            print(f"!! ERROR loading recording: {e}")
             return False
-        recordings.sort(reverse=True)
-        filename = os.path.join(recordings_dir, recordings[0])
 
-    try:
-        state["recorded_actions"] = []
 
-        with open(filename, "r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+def ensure_recording_loaded(state):
+    """The selected Recording, parsed now if the preload has not got to it yet"""
+    with _load_lock:
+        recording = as_recording(state["recorded_actions"])
+        if not recording and load_recording(state):
+            recording = state["recorded_actions"]
+        return recording
+
+
+def preload_recording(state, on_done=None):
+    """
+    Recover, select and parse the newest recording on a background thread,
+    so startup does not wait for it. on_done(started) runs when it finishes.
+    """
+
+    def run():
+        started = time.perf_counter()
+        try:
+            recover_recordings()
+            get_recording_catalog().refresh()
+            with _load_lock:
+                # Hotkeys are live already: leave a recording in progress, a
+                # stopped one or an early playback's selection alone
+                if not state["is_recording"] and not state.get("last_recording_file"):
+                    if select_latest_recording(state):
+                        ensure_recording_loaded(state)
+        except Exception as e:
+            print(f"!! ERROR preloading recording: {e}")
+        if on_done is not None:
+            on_done(started)
+
+    thread = threading.Thread(target=run, name="recording-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_available_recordings():
+    """Get list of all available recording files, newest first"""
+    recordings_dir = get_recordings_folder()
+    recordings = [
+        f for f in os.listdir(recordings_dir) if f.endswith(RECORDING_EXTENSIONS)
+    ]
+    recordings.sort(reverse=True)
+    return [os.path.join(recordings_dir, f) for f in recordings]
 
-            for row in reader:
-                action = {"time": float(row["time"]), "type": row["type"]}
 
-                if row["key"]:
-                    key = string_to_key(row["key"])
-                    if key:
-                        action["key"] = key
+_catalog = None
+_catalog_lock = threading.Lock()
 
-                if row["button"]:
-                    action["button"] = string_to_button(row["button"])
 
-                if row["x"]:
-                    action["x"] = int(row["x"])
-                if row["y"]:
-                    action["y"] = int(row["y"])
+def get_recording_catalog():
+    """The catalog of the recordings folder, loaded on first use"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = RecordingCatalog(
+                get_recordings_folder(), read_recording, RECORDING_EXTENSIONS
+            )
+    return _catalog
 
-                state["recorded_actions"].append(action)
 
+def select_recording(state, filename):
+    """Make filename the recording playback uses; it is parsed when played"""
+    with _load_lock:
         state["last_recording_file"] = filename
-        print(
-            f">> LOAD: Recording loaded from {os.path.basename(filename)} ({len(state['recorded_actions'])} actions)"
-        )
-        return True
-    except Exception as e:
-        print(f"!! ERROR loading recording: {e}")
-        return False
+        state["recorded_actions"] = Recording()
+    print(f">> RECORDING: Selected {os.path.basename(filename)}")
 
 
-def get_available_recordings():
-    """Get list of all available recording files"""
-    recordings_dir = get_recordings_folder()
-    recordings = [f for f in os.listdir(recordings_dir) if f.endswith(".csv")]
-    recordings.sort(reverse=True)
-    return [os.path.join(recordings_dir, f) for f in recordings]
+def select_latest_recording(state):
+    """Refresh the catalog and select the newest recording without parsing it"""
+    catalog = get_recording_catalog()
+    catalog.refresh()
+    filename = catalog.latest()
+    if filename is None:
+        return False
+    select_recording(state, filename)
+    return True
+
+
+def finish_recording_file(filename, config=None):
+    """
+    Convert the streamed CSV of a finished recording to the binary format,
+    simplifying the mouse path first if config asks for it at save time.
+    Returns (filename, Recording), the CSV's own name if the conversion
+    fails. The CSV is left for the caller to remove.
+    """
+    recording = simplify_for(config or {}, read_recording_csv(filename), "save")
+    binary_filename = os.path.splitext(filename)[0] + RECORDING_EXT
+    try:
+        write_binary(recording, binary_filename)
+    except (OSError, ValueError) as e:
+        print(f">> SAVE: Keeping CSV, binary conversion failed: {e}")
+        return filename, recording
+    return binary_filename, recording
+
+
+def finish_recording_in_background(state, filename, update_overlay):
+    """
+    finish_recording_file() on its own thread, so stopping never waits for
+    the conversion. Until it is done the streamed CSV stays selected (and
+    playable); the result is only published if it still is. Returns the thread.
+    """
+    config = dict(state["config"])
+
+    def run():
+        try:
+            binary_filename, recording = finish_recording_file(filename, config)
+        except Exception as e:
+            print(f"!! ERROR converting recording: {e}")
+            return
+        with _load_lock:
+            # Swap under the lock: a playback never finds the CSV half gone
+            if binary_filename != filename:
+                os.remove(filename)
+            if state.get("last_recording_file") == filename:
+                state["last_recording_file"] = binary_filename
+                state["recorded_actions"] = recording
+        get_recording_catalog().update(binary_filename, recording, replaces=filename)
+        print(f">> SAVE: Recording saved to {binary_filename}")
+        update_overlay()
+
+    thread = threading.Thread(target=run, name="recording-finish")
+    thread.start()
+    return thread
 
 
 def start_recording(state, update_overlay):
@@ -167,10 +399,25 @@ def start_recording(state, update_overlay):
         print(">> RECORDING: Already recording")
         return
 
+    c = state["config"]
+    try:
+        state["recording_writer"] = RecordingWriter(
+            new_recording_filename(".csv"),
+            float(c.get("recording_flush_interval", 0.5)),
+            int(c.get("recording_flush_rows", 256)),
+        )
+    except OSError as e:
+        print(f"!! ERROR: Cannot start recording file: {e}")
+        return
+
+    state["mouse_sampler"] = MoveSampler(
+        float(c.get("mouse_sample_tolerance_px", DEFAULT_TOLERANCE_PX)),
+        float(c.get("mouse_sample_max_rate", DEFAULT_MAX_RATE)),
+        float(c.get("mouse_sample_max_gap_ms", DEFAULT_MAX_GAP_MS)),
+    )
     state["is_recording"] = True
-    state["recorded_actions"] = []
+    state["recorded_actions"] = Recording()
     state["recording_start_time"] = time.perf_counter()
-    state["last_mouse_move_time"] = 0
     state["pressed_keys"] = set()
     print(">> RECORDING: STARTED - Press F5 again to stop")
     print(">> RECORDING: Supports simultaneous key presses")
@@ -178,28 +425,53 @@ def start_recording(state, update_overlay):
 
 
 def stop_recording(state, update_overlay):
+    """Stop recording; returns the thread finishing the file (or None)"""
     if not state["is_recording"]:
-        return
+        return None
+
+    sampler = state["mouse_sampler"]
+    pending = sampler.take_pending()
+    if pending is not None:
+        # Letzte gepufferte Bewegung, sonst fehlt die Endposition
+        x, y, at = pending
+        record_action(state, "mouse_move", at=at, x=x, y=y)
 
     state["is_recording"] = False
     total_time = time.perf_counter() - state["recording_start_time"]
-    action_count = len(state["recorded_actions"])
+    writer = state["recording_writer"]
+    state["recording_writer"] = None
+    action_count = writer.count if writer else len(state["recorded_actions"])
     print(
         f">> RECORDING: STOPPED - {action_count} actions recorded in {total_time:.2f}s"
     )
-
-    if action_count > 0:
+    if sampler.seen:
+        print(f">> RECORDING: Kept {sampler.kept} of {sampler.seen} mouse moves")
+
+    finisher = None
+    if writer:
+        filename = writer.close()
+        if filename:
+            # Playback loads the streamed CSV lazily until the .mrec is ready
+            with _load_lock:
+                state["recorded_actions"] = Recording()
+                state["last_recording_file"] = filename
+            finisher = finish_recording_in_background(state, filename, update_overlay)
+    elif action_count > 0:
         save_recording(state)
 
     update_overlay()
+    return finisher
 
 
-def record_action(state, action_type, **kwargs):
+def record_action(state, action_type, at=None, **kwargs):
+    """at is the perf_counter time the hook saw the event (default: now)"""
     if not state["is_recording"]:
         return
 
-    timestamp = time.perf_counter() - state["recording_start_time"]
-    action = {"type": action_type, "time": timestamp, **kwargs}
+    if at is None:
+        at = time.perf_counter()
+    # Events queued just before the start trigger was handled count as t=0
+    timestamp = max(0.0, at - state["recording_start_time"])
 
     if action_type == "key_press" and "key" in kwargs:
         key_str = key_to_string(kwargs["key"])
@@ -208,7 +480,65 @@ def record_action(state, action_type, **kwargs):
         key_str = key_to_string(kwargs["key"])
         state["pressed_keys"].discard(key_str)
 
-    state["recorded_actions"].append(action)
+    writer = state.get("recording_writer")
+    if writer is not None:
+        # Encoded right away: no live pynput objects pile up in memory
+        writer.append(encode_action(action_type, timestamp, **kwargs))
+    else:
+        key, button = kwargs.get("key"), kwargs.get("button")
+        if key is not None:
+            symbol = key_to_string(key)
+        else:
+            symbol = None if button is None else button_to_string(button)
+        state["recorded_actions"].append(
+            timestamp,
+            TYPE_CODES[action_type],
+            symbol,
+            kwargs.get("x"),
+            kwargs.get("y"),
+        )
+
+
+def playback_groups(recording, window=DEFAULT_GROUP_WINDOW):
+    """
+    Split a Recording into (offset, events) groups in the original event
+    order. A group holds the events within window seconds of its first one,
+    events are (action_type, target, x, y) with key/button ids as targets.
+    """
+    groups = []
+    events = None
+    group_end = None
+    symbols = recording.symbols
+    for time_val, type_code, code, x, y in zip(
+        recording.times,
+        recording.types,
+        recording.codes,
+        recording.xs,
+        recording.ys,
+    ):
+        if events is None or time_val >= group_end:
+            events = []
+            groups.append((time_val, events))
+            group_end = time_val + window
+        target = symbols[code]
+        if target is None and type_code in (MOUSE_PRESS, MOUSE_RELEASE):
+            target = "left"
+        events.append((EVENT_TYPES[type_code], target, x, y))
+    return groups
+
+
+def _held_inputs(groups):
+    """Keys and buttons still down after the given groups were sent"""
+    held = set()
+    for _, events in groups:
+        for action_type, target, _, _ in events:
+            if action_type in ("key_press", "mouse_press"):
+                held.add((action_type, target))
+            elif action_type == "key_release":
+                held.discard(("key_press", target))
+            elif action_type == "mouse_release":
+                held.discard(("mouse_press", target))
+    return held
 
 
 def playback_recording(state):
@@ -219,65 +549,51 @@ def playback_recording(state):
         print(">> PLAYBACK: Cannot playback while recording")
         return
 
-    if not state["recorded_actions"]:
-        if not load_recording(state):
-            print(">> PLAYBACK: No recording available")
-            return
-
-    print(f">> PLAYBACK: Starting {len(state['recorded_actions'])} actions")
-    print(">> PLAYBACK: Replaying simultaneous inputs...")
-    start_time = time.perf_counter()
-
-    action_groups = {}
-    for action in state["recorded_actions"]:
-        action_time = action["time"]
-        time_key = round(action_time, 3)
-        if time_key not in action_groups:
-            action_groups[time_key] = []
-        action_groups[time_key].append(action)
-
-    sorted_times = sorted(action_groups.keys())
-
-    for action_time in sorted_times:
-        target_time = start_time + action_time
-        while time.perf_counter() < target_time:
-            time.sleep(0.0001)
-
-        actions = action_groups[action_time]
-
-        for action in actions:
-            action_type = action["type"]
-
-            if action_type == "key_press":
-                try:
-                    key = action.get("key")
-                    if isinstance(key, str):
-                        keyboard_controller.press(keyboard.KeyCode.from_char(key))
-                    else:
-                        keyboard_controller.press(key)
-                except Exception as e:
-                    print(f"!! ERROR in key_press: {e}")
-
-            elif action_type == "key_release":
-                try:
-                    key = action.get("key")
-                    if isinstance(key, str):
-                        keyboard_controller.release(keyboard.KeyCode.from_char(key))
-                    else:
-                        keyboard_controller.release(key)
-                except Exception as e:
-                    print(f"!! ERROR in key_release: {e}")
-
-            elif action_type == "mouse_press":
-                button = action.get("button", Button.left)
-                mouse.press(button)
-
-            elif action_type == "mouse_release":
-                button = action.get("button", Button.left)
-                mouse.release(button)
-
-            elif action_type == "mouse_move":
-                x, y = action.get("x"), action.get("y")
-                mouse.position = (x, y)
-
-    print(f">> PLAYBACK: COMPLETE ({time.perf_counter() - start_time:.3f}s)")
+    recording = ensure_recording_loaded(state)
+    if not recording:
+        print(">> PLAYBACK: No recording available")
+        return
+    recording = simplify_for(state["config"], recording, "playback")
+
+    window = float(state["config"].get("playback_group_window_ms", 1.0)) / 1000
+    groups = playback_groups(recording, window)
+    # Alles vorab aufbauen: in der Schleife nur noch warten und senden
+    backend = input_control.backend
+    prepare_group = backend.prepare_group
+    send_group = backend.send_group
+    prepared = [(offset, prepare_group(events)) for offset, events in groups]
+
+    print(f">> PLAYBACK: Starting {len(recording)} actions in {len(groups)} groups")
+    histogram = timing.LatenessHistogram()
+    run = telemetry.new_run()
+    start_time = timing.perf_counter()
+
+    for index, (offset, group) in enumerate(prepared):
+        deadline = start_time + offset
+        try:
+            lateness = wait_until(deadline)
+        except MacroCancelled:
+            for action_type, target in _held_inputs(groups[:index]):
+                if action_type == "key_press":
+                    backend.release_key(target)
+                else:
+                    backend.release_button(target)
+            raise
+
+        try:
+            send_group(group)
+        except Exception as e:
+            print(f"!! ERROR in playback group at {offset:.3f}s: {e}")
+        histogram.add(lateness)
+        if run is not None:
+            telemetry.record(
+                run, "playback", "playback group", offset, offset + lateness, lateness
+            )
+        mark_first_input()
+
+    print(f">> PLAYBACK: COMPLETE ({timing.perf_counter() - start_time:.3f}s)")
+    print(f">> PLAYBACK: Lateness {histogram.summary()}")
+    for label, count in histogram.rows():
+        if count:
+            print(f">> PLAYBACK:   {label:<10} {count}")
+    state["last_playback_lateness"] = histogram
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from recording_store import KEY_PRESS, MOUSE_MOVE, MOUSE_PRESS
+
+CATALOG_FILE = "catalog.json"
+CATALOG_VERSION = 2
+SUMMARY_FIELDS = ("count", "duration", "keys", "buttons", "moves")
+# Stamp new_recording_filename() puts in every recording name
+NAME_TIMESTAMP = re.compile(r"(\d{8}_\d{6})")
+
+
+def file_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def recorded_time(name, stat, entry=None):
+    """
+    When a recording was made: the timestamp in its name, else the time it
+    was first cataloged (its mtime then). Unlike the mtime, copying or
+    touching the file later does not change it.
+    """
+    match = NAME_TIMESTAMP.search(name)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            pass
+    if entry is not None and "recorded" in entry:
+        return entry["recorded"]
+    return stat.st_mtime
+
+
+def summarize(recording):
+    """Event count, duration and key/button press counts of a Recording"""
+    keys = {}
+    buttons = {}
+    moves = 0
+    symbols = recording.symbols
+    for type_code, code in zip(recording.types, recording.codes):
+        if type_code == KEY_PRESS:
+            symbol = symbols[code]
+            if symbol:
+                keys[symbol] = keys.get(symbol, 0) + 1
+        elif type_code == MOUSE_PRESS:
+            symbol = symbols[code] or "left"
+            buttons[symbol] = buttons.get(symbol, 0) + 1
+        elif type_code == MOUSE_MOVE:
+            moves += 1
+    return {
+        "count": len(recording),
+        "duration": recording.duration(),
+        "keys": keys,
+        "buttons": buttons,
+        "moves": moves,
+    }
+
+
+def entry_label(entry):
+    """One-line description for lists: name, length and the keys pressed"""
+    keys = sorted(entry["keys"], key=lambda symbol: -entry["keys"][symbol])
+    shown = ", ".join(symbol.split(".", 1)[-1].split(":", 1)[-1] for symbol in keys)
+    return (
+        f"{os.path.splitext(entry['name'])[0]}  {entry['count']} actions  "
+        f"{entry['duration']:.1f}s  [{shown}]"
+    )
+
+
+class RecordingCatalog:
+    """
+    Metadata of every recording in a folder (size, mtime, recorded time,
+    content hash, event count, duration, key/button summary), kept in
+    <folder>/catalog.json.
+    refresh() only re-reads files whose size or mtime changed, so listing
+    and filtering recordings never parses them; read(path) is only called
+    for new or changed files.
+    """
+
+    def __init__(self, folder, read, extensions):
+        self.folder = folder
+        self.path = os.path.join(folder, CATALOG_FILE)
+        self.read = read
+        self.extensions = extensions
+        self.entries = {}
+        # Bumped on every change, lets views redraw only when needed
+        self.version = 0
+        # Folder mtime at the last refresh: adding, removing or renaming files changes it
+        self.folder_mtime = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                self.entries = data.get("recordings", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"!! ERROR reading recording catalog, rebuilding: {e}")
+
+    def _save(self):
+        partial = self.path + ".tmp"
+        try:
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": CATALOG_VERSION, "recordings": self.entries},
+                    f,
+                    indent=1,
+                )
+            os.replace(partial, self.path)
+        except OSError as e:
+            print(f"!! ERROR saving recording catalog: {e}")
+
+    def _scan(self, name, stat, recording=None):
+        """Fresh entry for one file; reuses the old summary if the content is unchanged"""
+        path = os.path.join(self.folder, name)
+        with open(path, "rb") as f:
+            digest = file_hash(f.read())
+        entry = self.entries.get(name)
+        if entry is None or entry["hash"] != digest or recording is not None:
+            summary = summarize(recording if recording is not None else self.read(path))
+        else:
+            summary = {field: entry[field] for field in SUMMARY_FIELDS}
+        return {
+            "name": name,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "recorded": recorded_time(name, stat, entry),
+            "hash": digest,
+            **summary,
+        }
+
+    def refresh(self):
+        """Bring the catalog in line with the folder, returns the number of changes"""
+        with self._lock:
+            changes = 0
+            names = set()
+            # Taken before listing, so a file added meanwhile triggers another refresh
+            self.folder_mtime = self._folder_mtime()
+            for name in os.listdir(self.folder):
+                if not name.endswith(self.extensions):
+                    continue
+                names.add(name)
+                try:
+                    stat = os.stat(os.path.join(self.folder, name))
+                    entry = self.entries.get(name)
+                    if (
+                        entry is not None
+                        and entry["size"] == stat.st_size
+                        and entry["mtime"] == stat.st_mtime
+                    ):
+                        continue
+                    self.entries[name] = self._scan(name, stat)
+                    changes += 1
+                except Exception as e:
+                    print(f"!! ERROR cataloging {name}: {e}")
+
+            for name in list(self.entries):
+                if name not in names:
+                    del self.entries[name]
+                    changes += 1
+            if changes:
+                self.version += 1
+                self._save()
+            return changes
+
+    def _folder_mtime(self):
+        try:
+            return os.stat(self.folder).st_mtime
+        except OSError:
+            return None
+
+    def refresh_if_changed(self):
+        """refresh() only if the folder's mtime moved since the last one"""
+        if self._folder_mtime() == self.folder_mtime:
+            return 0
+        return self.refresh()
+
+    def update(self, path, recording=None, replaces=None):
+        """
+        Catalog one new or rewritten file (pass its Recording if already in
+        memory). replaces is a file it took the place of, e.g. the CSV a
+        stopped recording was converted from; its entry is dropped.
+        """
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.folder):
+            return None
+        name = os.path.basename(path)
+        with self._lock:
+            if replaces is not None and os.path.basename(replaces) != name:
+                self.entries.pop(os.path.basename(replaces), None)
+            try:
+                self.entries[name] = self._scan(name, os.stat(path), recording)
+            except Exception as e:
+                print(f"!! ERROR cataloging {name}: {e}")
+                return None
+            self.version += 1
+            self._save()
+            return self.entries[name]
+
+    def recordings(self, query=""):
+        """Newest recordings first; every query word must match the name or a key/button"""
+        words = query.lower().split()
+        with self._lock:
+            entries = sorted(
+                self.entries.values(),
+                key=lambda entry: (entry["recorded"], entry["name"]),
+                reverse=True,
+            )
+        if not words:
+            return entries
+        matches = []
+        for entry in entries:
+            haystack = " ".join(
+                [entry["name"], *entry["keys"], *entry["buttons"]]
+            ).lower()
+            if all(word in haystack for word in words):
+                matches.append(entry)
+        return matches
+
+    def latest(self):
+        """Path of the most recently recorded file, None if there is none"""
+        entries = self.recordings()
+        return os.path.join(self.folder, entries[0]["name"]) if entries else None
@@ -0,0 +1,261 @@
+"""
+Binary columnar recording format (.mrec).
+
+    header   32 bytes, little-endian:
+             magic "MREC", version u16, flags u16, event count u32,
+             duration f64 (seconds), CRC32 of everything after the header u32,
+             symbol table size u32, reserved u32
+    symbols  key/button ids ("char:e", "left"), each a u16 byte length and
+             the UTF-8 bytes (version 1 files: "\\n"-separated)
+    columns  time deltas i32 (microseconds), types u8, symbol codes u16,
+             x deltas i16, y deltas i16 - one contiguous block per column
+
+Timestamps are stored to the microsecond. Events without a position (key
+events) have the NO_POSITION_FLAG bit set in their type byte and a zero
+delta, so mouse deltas run from one mouse event to the next.
+
+Loading maps the file with mmap and copies each column straight into an
+array; only the deltas are summed back up, nothing is parsed. Conversion
+to and from CSV:
+
+    python recording_format.py import recordings/recording_x.csv
+    python recording_format.py export recordings/recording_x.mrec
+    python recording_format.py info recordings/recording_x.mrec
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate, repeat
+from operator import truediv
+
+from recording_store import NO_POSITION, Recording
+
+RECORDING_EXT = ".mrec"
+MAGIC = b"MREC"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHIdIII")
+SYMBOL_LENGTH = struct.Struct("<H")
+NO_POSITION_FLAG = 0x80
+
+# (typecode, bytes per event) in file order
+COLUMNS = (("i", 4), ("B", 1), ("H", 2), ("h", 2), ("h", 2))
+BYTES_PER_EVENT = sum(size for _, size in COLUMNS)
+
+_STRIP_FLAG = bytes(code & ~NO_POSITION_FLAG for code in range(256))
+_FLAG_ONLY = bytes(1 if code & NO_POSITION_FLAG else 0 for code in range(256))
+
+
+class RecordingFormatError(ValueError):
+    """File is not a readable .mrec recording (bad magic, version or checksum)"""
+
+
+def _deltas(values):
+    previous = 0
+    for value in values:
+        yield value - previous
+        previous = value
+
+
+def _column(typecode, values):
+    """array(typecode) of values, ValueError if one does not fit"""
+    try:
+        column = array(typecode, values)
+    except OverflowError as e:
+        raise ValueError(f"value out of range for the binary format: {e}")
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+def encode_symbols(symbols):
+    """Length-prefixed symbol table, so ids may hold any character ("char:\\n")"""
+    parts = []
+    for symbol in symbols:
+        data = symbol.encode("utf-8")
+        if len(data) > 0xFFFF:
+            raise ValueError(f"symbol too long for the binary format: {symbol[:40]!r}")
+        parts.append(SYMBOL_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode_symbols(data, version, filename):
+    """Symbol ids of a symbol table block"""
+    if version < 2:
+        text = data.decode("utf-8")
+        return text.split("\n") if text else []
+    symbols = []
+    offset = 0
+    while offset < len(data):
+        if offset + SYMBOL_LENGTH.size > len(data):
+            raise RecordingFormatError(f"{filename}: truncated symbol table")
+        (length,) = SYMBOL_LENGTH.unpack_from(data, offset)
+        offset += SYMBOL_LENGTH.size
+        if offset + length > len(data):
+            raise RecordingFormatError(f"{filename}: truncated symbol table")
+        symbols.append(data[offset : offset + length].decode("utf-8"))
+        offset += length
+    return symbols
+
+
+def encode_recording(recording):
+    """The .mrec bytes for recording; ValueError if it cannot be stored"""
+    times = [round(t * 1e6) for t in recording.times]
+    types = bytearray(recording.types)
+    # Mauspositionen relativ zum letzten Maus-Event, Tasten ohne Position
+    mouse_xs, mouse_ys = [], []
+    last_x = last_y = 0
+    for i, (x, y) in enumerate(zip(recording.xs, recording.ys)):
+        if x == NO_POSITION or y == NO_POSITION:
+            types[i] |= NO_POSITION_FLAG
+            x, y = last_x, last_y
+        mouse_xs.append(x)
+        mouse_ys.append(y)
+        last_x, last_y = x, y
+
+    symbols = encode_symbols(recording.symbols[1:])
+    body = b"".join(
+        (
+            symbols,
+            _column("i", _deltas(times)).tobytes(),
+            bytes(types),
+            _column("H", recording.codes).tobytes(),
+            _column("h", _deltas(mouse_xs)).tobytes(),
+            _column("h", _deltas(mouse_ys)).tobytes(),
+        )
+    )
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        0,
+        len(recording),
+        recording.duration(),
+        zlib.crc32(body),
+        len(symbols),
+        0,
+    )
+    return header + body
+
+
+def write_binary(recording, filename):
+    """Write recording as .mrec (atomically via a temp file)"""
+    data = encode_recording(recording)
+    partial = filename + ".tmp"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, filename)
+    return len(data)
+
+
+def _unpack_header(data, filename):
+    if len(data) < HEADER.size:
+        raise RecordingFormatError(f"{filename}: truncated header")
+    magic, version, flags, count, duration, checksum, symbols_size, _ = (
+        HEADER.unpack_from(data)
+    )
+    if magic != MAGIC:
+        raise RecordingFormatError(f"{filename}: not a .mrec recording")
+    if version > FORMAT_VERSION:
+        raise RecordingFormatError(
+            f"{filename}: format version {version} is newer than {FORMAT_VERSION}"
+        )
+    return {
+        "version": version,
+        "flags": flags,
+        "count": count,
+        "duration": duration,
+        "checksum": checksum,
+        "symbols_size": symbols_size,
+    }
+
+
+def read_header(filename):
+    """Header fields of a .mrec file without reading the columns"""
+    with open(filename, "rb") as f:
+        return _unpack_header(f.read(HEADER.size), filename)
+
+
+def _load_column(typecode, data):
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+def read_binary(filename, verify=True):
+    """Map a .mrec file and decode it into a Recording"""
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header = _unpack_header(data, filename)
+            count = header["count"]
+            offset = HEADER.size + header["symbols_size"]
+            if len(data) != offset + count * BYTES_PER_EVENT:
+                raise RecordingFormatError(f"{filename}: size does not match header")
+            if verify and zlib.crc32(data[HEADER.size :]) != header["checksum"]:
+                raise RecordingFormatError(f"{filename}: checksum mismatch")
+
+            symbols = decode_symbols(
+                data[HEADER.size : offset], header["version"], filename
+            )
+            columns = []
+            for _, size in COLUMNS:
+                end = offset + count * size
+                columns.append(data[offset:end])
+                offset = end
+
+    time_deltas, raw_types, codes, x_deltas, y_deltas = columns
+    times = array(
+        "d", map(truediv, accumulate(_load_column("i", time_deltas)), repeat(1e6))
+    )
+    types = _load_column("B", raw_types.translate(_STRIP_FLAG))
+    xs = array("i", accumulate(_load_column("h", x_deltas)))
+    ys = array("i", accumulate(_load_column("h", y_deltas)))
+    # Positionslose Events (Tasten) wieder markieren
+    flagged = raw_types.translate(_FLAG_ONLY)
+    i = flagged.find(1)
+    while i >= 0:
+        xs[i] = ys[i] = NO_POSITION
+        i = flagged.find(1, i + 1)
+
+    return Recording.from_columns(
+        times,
+        types,
+        _load_column("H", codes),
+        xs,
+        ys,
+        symbols,
+    )
+
+
+def main():
+    # Lazy import: recording pulls in pynput and the input backends
+    import recording
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("import", "export", "info"):
+        print("Usage: python recording_format.py import|export|info <file>")
+        sys.exit(1)
+    command, filename = sys.argv[1], sys.argv[2]
+    try:
+        if command == "import":
+            recording.import_csv_recording(filename)
+        elif command == "export":
+            recording.export_csv_recording(filename)
+        else:
+            header = read_header(filename)
+            print(
+                f">> RECORDING: {os.path.basename(filename)} v{header['version']}, "
+                f"{header['count']} actions, {header['duration']:.3f}s, "
+                f"crc {header['checksum']:08x}"
+            )
+    except (OSError, ValueError) as e:
+        print(f"!! ERROR: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
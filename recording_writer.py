@@ -0,0 +1,131 @@
+import csv
+import os
+import threading
+from collections import deque
+
+PARTIAL_SUFFIX = ".part"
+CSV_HEADER = ["time", "type", "key", "button", "x", "y"]
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_FLUSH_ROWS = 256
+
+# .part files of writers still streaming; recovery must never touch them
+_active_partials = set()
+
+
+class RecordingWriter:
+    """
+    Streams encoded recording rows to an append-only "<name>.csv.part" file
+    from a background thread, flushing every flush_interval seconds or
+    flush_rows rows, so memory stays flat however long the recording runs.
+    close() renames the file to its final name; a .part file left behind
+    by a crash is picked up by recover_partial_recordings().
+    """
+
+    def __init__(
+        self,
+        filename,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        flush_rows=DEFAULT_FLUSH_ROWS,
+    ):
+        self.filename = filename
+        self.partial = filename + PARTIAL_SUFFIX
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.count = 0
+        self._rows = deque()
+        self._wakeup = threading.Event()
+        self._closing = False
+
+        # Registered before the file exists, so recovery can never see it unregistered
+        partial = os.path.abspath(self.partial)
+        _active_partials.add(partial)
+        try:
+            self._file = open(self.partial, "w", newline="", encoding="utf-8")
+        except OSError:
+            _active_partials.discard(partial)
+            raise
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(CSV_HEADER)
+        self._file.flush()
+
+        self._thread = threading.Thread(
+            target=self._run, name="recording-writer", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, row):
+        """Queue one (time, type, key, button, x, y) row; never blocks on disk"""
+        self._rows.append(row)
+        self.count += 1
+        if len(self._rows) >= self.flush_rows:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            closing = self._closing
+            self._write_pending()
+            if closing:
+                return
+
+    def _write_pending(self):
+        rows = self._rows
+        if not rows:
+            return
+        try:
+            while rows:
+                self._csv.writerow(rows.popleft())
+            self._file.flush()
+        except Exception as e:
+            print(f"!! ERROR writing recording: {e}")
+
+    def close(self):
+        """Write the rest, returns the final filename (None if nothing was recorded)"""
+        self._closing = True
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
+        try:
+            if not self.count:
+                os.remove(self.partial)
+                return None
+            os.replace(self.partial, self.filename)
+            return self.filename
+        finally:
+            _active_partials.discard(os.path.abspath(self.partial))
+
+
+def recover_partial_recordings(folder):
+    """
+    Turn .part files left by a crash into normal recordings, dropping a torn
+    last row. Files of writers still running are skipped. Returns the
+    recovered filenames.
+    """
+    recovered = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".csv" + PARTIAL_SUFFIX):
+            continue
+        partial = os.path.join(folder, name)
+        if os.path.abspath(partial) in _active_partials:
+            continue
+        try:
+            with open(partial, "rb") as f:
+                data = f.read()
+            # Nur vollstaendige Zeilen behalten
+            data = data[: data.rfind(b"\n") + 1]
+            rows = data.count(b"\n") - 1
+            if rows <= 0:
+                os.remove(partial)
+                continue
+            filename = partial[: -len(PARTIAL_SUFFIX)]
+            with open(filename, "wb") as f:
+                f.write(data)
+            os.remove(partial)
+            recovered.append(filename)
+            print(
+                f">> RECORDING: Recovered {rows} actions into {os.path.basename(filename)}"
+            )
+        except Exception as e:
+            print(f"!! ERROR recovering {name}: {e}")
+    return recovered
@@ -0,0 +1,137 @@
+"""
+Virtual-clock simulation of the macros and playback.
+
+Runs a macro on a VirtualClock with the memory input backend, so a full
+throw or timeline macro finishes in microseconds of wall time and returns
+the exact event trace it would have produced (netsh commands included):
+
+    python simulation.py throw
+    python simulation.py throw_v2
+    python simulation.py macro
+
+Switches the process-wide clock and backend while it runs, so never
+simulate while real macros are running.
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+import input_control
+import network
+import recording
+import telemetry
+import timing
+from config import DEFAULT_CONFIG, state as app_state
+from macros import run_complex_macro, run_throw_macro, run_throw_macro_v2
+
+
+def simulation_state(config=None, recorded_actions=None):
+    """Fresh state dict for one simulated run (config overrides the defaults)"""
+    sim_state = dict(app_state)
+    sim_state.update(
+        config={**DEFAULT_CONFIG, **(config or {})},
+        is_lagging=False,
+        is_running_macro=False,
+        is_recording=False,
+        wifi_profile=None,
+        recorded_actions=recording.as_recording(recorded_actions),
+    )
+    return sim_state
+
+
+def simulate(run, quiet=True):
+    """
+    Call run() on a virtual clock with the memory backend and return the
+    trace as (time, type, value) tuples, time in seconds from the start.
+    """
+    clock = timing.VirtualClock()
+    backend = input_control.MemoryBackend(clock.perf_counter)
+    backend.events = clock.events
+    telemetry_enabled = telemetry.enabled
+    telemetry.enabled = False
+
+    previous_clock = timing.set_clock(clock)
+    previous_backend = input_control.set_backend(backend)
+    try:
+        output = contextlib.redirect_stdout(io.StringIO())
+        with output if quiet else contextlib.nullcontext():
+            run()
+    finally:
+        input_control.set_backend(previous_backend)
+        timing.set_clock(previous_clock)
+        telemetry.enabled = telemetry_enabled
+    # Side actions run in parallel virtual time, so merge them back in order
+    return sorted(clock.events, key=lambda event: event[0])
+
+
+def _net_calls(sim_state):
+    def disconnect():
+        network.disconnect_net(sim_state, lambda: None)
+
+    def reconnect():
+        network.reconnect_net(sim_state, lambda: None)
+
+    return disconnect, reconnect
+
+
+def simulate_throw(config=None, quiet=True):
+    sim_state = simulation_state(config)
+    return simulate(lambda: run_throw_macro(sim_state), quiet)
+
+
+def simulate_throw_v2(config=None, quiet=True):
+    sim_state = simulation_state(config)
+    disconnect, reconnect = _net_calls(sim_state)
+    return simulate(
+        lambda: run_throw_macro_v2(sim_state, lambda: None, disconnect, reconnect),
+        quiet,
+    )
+
+
+def simulate_timeline(config=None, quiet=True):
+    sim_state = simulation_state(config)
+    disconnect, reconnect = _net_calls(sim_state)
+    return simulate(
+        lambda: run_complex_macro(sim_state, lambda: None, disconnect, reconnect),
+        quiet,
+    )
+
+
+def simulate_playback(recorded_actions, config=None, quiet=True):
+    sim_state = simulation_state(config, recorded_actions)
+    return simulate(lambda: recording.playback_recording(sim_state), quiet)
+
+
+SIMULATIONS = {
+    "throw": simulate_throw,
+    "throw_v2": simulate_throw_v2,
+    "macro": simulate_timeline,
+}
+
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "throw"
+    if name not in SIMULATIONS:
+        print(f"!! ERROR: Unknown macro '{name}' (choose {', '.join(SIMULATIONS)})")
+        sys.exit(1)
+
+    from config import load_config
+
+    load_config()
+    wall_start = time.perf_counter()
+    trace = SIMULATIONS[name](app_state["config"])
+    wall = time.perf_counter() - wall_start
+
+    for at, action_type, value in trace:
+        print(f"{at * 1000:10.3f} ms  {action_type:<14} {value}")
+    end = trace[-1][0] if trace else 0.0
+    print(
+        f">> SIMULATION: {name} produced {len(trace)} events over "
+        f"{end:.3f}s virtual in {wall * 1000:.1f} ms wall"
+    )
+
+
+if __name__ == "__main__":
+    main()
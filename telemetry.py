@@ -0,0 +1,227 @@
+import itertools
+import json
+import os
+import platform
+import threading
+import time
+from config import CONFIG_FILE, add_config_listener
+
+TELEMETRY_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(CONFIG_FILE)), "macro_telemetry.jsonl"
+)
+BUFFER_SIZE = 16384
+
+# Timeline labels -> macro phase; labels not listed are their own phase
+PHASES = {
+    "clumsy toggle": "settle",
+    "clumsy toggle call": "clumsy toggle",
+    "pre-drag": "drag",
+    "drag": "drag",
+    "drag end": "drag",
+    "tab": "tab",
+    "tab dwell": "tab",
+    "post-tab": "tab",
+    "e-spam": "e-spam",
+    "e-spam up": "e-spam",
+    "final settle": "cleanup",
+    "hold down": "hold",
+    "hold release": "hold",
+    "net disconnect": "net",
+    "net reconnect": "net",
+    "spam start": "spam",
+    "spam click": "spam",
+    "spam click up": "spam",
+}
+
+LATENCY_LABEL = "trigger to input"
+
+PERCENTILES = (50, 95, 99)
+
+enabled = True
+
+# Trigger hook time of the macro running on this thread, until its first input
+_trigger = threading.local()
+# macro -> latest trigger-to-first-input latency (seconds)
+latest_latency = {}
+last_latency = None
+# Bumped on every new latency; the GUI polls it, macro threads never touch Tk
+latency_version = 0
+
+
+class PhaseBuffer:
+    """
+    Fixed-size ring of (run, macro, label, planned, actual, error) samples.
+    Writers never lock: the slot index comes from itertools.count (atomic
+    under the GIL) and a slot write is a single list store. Once full, the
+    oldest samples are overwritten.
+    """
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.size = size
+        self._slots = [None] * size
+        self._next = itertools.count()
+        self._runs = itertools.count(1)
+        self.written = 0
+
+    def new_run(self):
+        return next(self._runs)
+
+    def record(self, run, macro, label, planned, actual, error):
+        index = next(self._next)
+        self._slots[index % self.size] = (run, macro, label, planned, actual, error)
+        self.written = index + 1
+
+    def snapshot(self):
+        """Samples currently in the ring, oldest first"""
+        written = self.written
+        slots = list(self._slots)
+        if written <= self.size:
+            samples = slots[:written]
+        else:
+            start = written % self.size
+            samples = slots[start:] + slots[:start]
+        return [sample for sample in samples if sample is not None]
+
+    def clear(self):
+        self._slots = [None] * self.size
+        self._next = itertools.count()
+        self.written = 0
+
+
+buffer = PhaseBuffer()
+
+
+def new_run():
+    """Run id for one macro execution, or None while telemetry is disabled"""
+    return buffer.new_run() if enabled else None
+
+
+def record(run, macro, label, planned, actual, error):
+    buffer.record(run, macro, label, planned, actual, error)
+
+
+def arm_trigger(macro, triggered_at):
+    """Executor: measure from the trigger's hook time to macro's first injected input"""
+    _trigger.pending = (macro, triggered_at) if enabled and triggered_at else None
+
+
+def mark_first_input():
+    """Called right after a macro injects input; only the first call per run counts"""
+    pending = getattr(_trigger, "pending", None)
+    if pending is None:
+        return
+    global last_latency, latency_version
+    _trigger.pending = None
+    macro, triggered_at = pending
+    latency = time.perf_counter() - triggered_at
+    latest_latency[macro] = latency
+    last_latency = (macro, latency)
+    latency_version += 1
+    record(None, macro, LATENCY_LABEL, 0.0, latency, latency)
+
+
+def phase_of(label):
+    return PHASES.get(label, label)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[rank]
+
+
+def phase_summary(macro=None):
+    """{(macro, phase): {"count", "p50", "p95", "p99", "max"}} of the timing error in seconds"""
+    errors = {}
+    for _, sample_macro, label, _, _, error in buffer.snapshot():
+        if macro is None or sample_macro == macro:
+            errors.setdefault((sample_macro, phase_of(label)), []).append(error)
+
+    summary = {}
+    for key, values in errors.items():
+        values.sort()
+        stats = {"count": len(values), "max": values[-1]}
+        for pct in PERCENTILES:
+            stats[f"p{pct}"] = percentile(values, pct)
+        summary[key] = stats
+    return summary
+
+
+def print_phase_summary(macro=None):
+    summary = phase_summary(macro)
+    if not summary:
+        print(">> TELEMETRY: No samples recorded")
+        return
+    for (sample_macro, phase), stats in sorted(summary.items()):
+        print(
+            f">> TELEMETRY: {sample_macro:<9} {phase:<16} n={stats['count']:<5} "
+            f"p50 {stats['p50'] * 1000:6.2f} ms  p95 {stats['p95'] * 1000:6.2f} ms  "
+            f"p99 {stats['p99'] * 1000:6.2f} ms  max {stats['max'] * 1000:6.2f} ms"
+        )
+
+
+def _apply_config(config):
+    global enabled
+    enabled = bool(config.get("telemetry_enabled", True))
+
+
+add_config_listener(_apply_config)
+
+
+def export_telemetry(path=None, clear=True, hook_stats=None):
+    """
+    Append the buffered samples (and hook_stats, see HookConsumer.stats) to
+    the JSONL file, returns the sample count
+    """
+    path = path or TELEMETRY_FILE
+    samples = buffer.snapshot()
+    if not samples and not hook_stats:
+        return 0
+
+    machine = platform.node()
+    exported = time.time()
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            for name, stats in (hook_stats or {}).items():
+                f.write(
+                    json.dumps(
+                        {
+                            "exported": exported,
+                            "machine": machine,
+                            "type": "hook",
+                            "hook": name,
+                            **stats,
+                        }
+                    )
+                    + "\n"
+                )
+            for run, macro, label, planned, actual, error in samples:
+                f.write(
+                    json.dumps(
+                        {
+                            "exported": exported,
+                            "machine": machine,
+                            "type": "phase",
+                            "run": run,
+                            "macro": macro,
+                            "phase": phase_of(label),
+                            "label": label,
+                            "planned_ms": round(planned * 1000, 3),
+                            "actual_ms": round(actual * 1000, 3),
+                            "error_ms": round(error * 1000, 3),
+                        }
+                    )
+                    + "\n"
+                )
+    except OSError as e:
+        print(f"!! ERROR: Could not write telemetry: {e}")
+        return 0
+
+    if clear:
+        buffer.clear()
+    print(f">> TELEMETRY: Exported {len(samples)} samples to {path}")
+    return len(samples)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Headless: no injection, no display needed for the modules under test
+os.environ.setdefault("MACRO_INPUT_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
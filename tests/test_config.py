@@ -0,0 +1,30 @@
+import json
+
+import config
+from config import DEFAULT_CONFIG
+
+
+def _load(monkeypatch, path):
+    monkeypatch.setattr(config, "CONFIG_FILE", str(path))
+    monkeypatch.setitem(config.state, "config", config.state["config"])
+    config.load_config()
+    return config.state["config"]
+
+
+def test_defaults_are_not_shared_with_the_live_config(monkeypatch, tmp_path):
+    live = _load(monkeypatch, tmp_path / "missing.json")
+    live["retrigger_policies"]["throw"] = "restart"
+    live["trigger_min_interval"]["throw"] = 9.0
+
+    assert DEFAULT_CONFIG["retrigger_policies"]["throw"] != "restart"
+    assert DEFAULT_CONFIG["trigger_min_interval"].get("throw") != 9.0
+
+
+def test_missing_nested_keys_are_filled_with_copies(monkeypatch, tmp_path):
+    path = tmp_path / "macro_config.json"
+    path.write_text(json.dumps({"click_cps": 20}), encoding="utf-8")
+    live = _load(monkeypatch, path)
+    live["retrigger_policies"]["macro"] = "queue"
+
+    assert live["click_cps"] == 20
+    assert DEFAULT_CONFIG["retrigger_policies"]["macro"] != "queue"
@@ -0,0 +1,62 @@
+import threading
+
+from executor import MAX_QUEUED_PER_MACRO, MacroExecutor
+
+
+def test_different_macros_run_side_by_side():
+    executor = MacroExecutor()
+    release = threading.Event()
+    thrown = threading.Event()
+
+    executor.submit("macro", lambda: release.wait(5.0), "queue")
+    executor.submit("throw", thrown.set, "queue")
+    # The throw does not wait for the long timeline macro
+    assert thrown.wait(2.0)
+    assert executor.is_busy("macro")
+    release.set()
+
+
+def test_one_macro_runs_its_triggers_one_at_a_time():
+    executor = MacroExecutor()
+    release = threading.Event()
+    started = threading.Event()
+    finished = threading.Semaphore(0)
+    running = []
+    overlaps = []
+
+    def run():
+        overlaps.append(len(running))
+        running.append(True)
+        started.set()
+        release.wait(5.0)
+        running.pop()
+        finished.release()
+
+    assert executor.submit("throw", run, "queue") is not None
+    assert started.wait(2.0)
+    queued = [executor.submit("throw", run, "queue") for _ in range(5)]
+    assert sum(job is not None for job in queued) == MAX_QUEUED_PER_MACRO
+    assert executor.submit("throw", run, "ignore") is None
+
+    release.set()
+    for _ in range(1 + MAX_QUEUED_PER_MACRO):
+        assert finished.acquire(timeout=2.0)
+    assert overlaps == [0] * (1 + MAX_QUEUED_PER_MACRO)
+
+
+def test_warmups_all_run_before_the_first_macro():
+    executor = MacroExecutor()
+    order = []
+    gate = threading.Event()
+    done = threading.Event()
+
+    def warmup(i):
+        if i == 0:
+            gate.wait(5.0)
+        order.append(i)
+
+    executor.warm_up([lambda i=i: warmup(i) for i in range(MAX_QUEUED_PER_MACRO + 2)])
+    executor.submit("macro", lambda: (order.append("macro"), done.set()), "queue")
+    gate.set()
+    assert done.wait(2.0)
+    assert order == list(range(MAX_QUEUED_PER_MACRO + 2)) + ["macro"]
@@ -0,0 +1,90 @@
+import inspect
+import threading
+import time
+
+import hookqueue
+from hookqueue import CLICK_ARITY, KEY_ARITY, MOVE_ARITY, HookConsumer, SPSCQueue
+
+
+def pynput_wrap(f, args):
+    """Callback adaption of pynput 1.8's AbstractListener._wrap"""
+    argspec = inspect.getfullargspec(f)
+    actual = len(inspect.signature(f).parameters)
+    defaults = len(argspec.defaults) if argspec.defaults else 0
+    if actual - defaults > args:
+        raise ValueError(f)
+    elif actual >= args or argspec.varargs is not None:
+        return f
+    return lambda *a: f(*a[:actual])
+
+
+def test_callbacks_drop_the_injected_flag():
+    calls = []
+    consumer = HookConsumer(64)
+    keyboard = consumer.add_queue("keyboard")
+    mouse = consumer.add_queue("mouse")
+    done = threading.Event()
+
+    def on_press(key, at=None):
+        calls.append(("press", key, at))
+
+    def on_move(x, y, at=None):
+        calls.append(("move", x, y, at))
+
+    def on_click(x, y, button, pressed, at=None):
+        calls.append(("click", x, y, button, pressed, at))
+        done.set()
+
+    # pynput 1.8 calls on_press(key, injected), on_move(x, y, injected), ...
+    pynput_wrap(keyboard.hook(on_press, KEY_ARITY), 2)("a", False)
+    pynput_wrap(mouse.hook(on_move, MOVE_ARITY), 3)(10, 20, True)
+    pynput_wrap(mouse.hook(on_click, CLICK_ARITY), 5)(10, 20, "left", True, False)
+    assert done.wait(2.0)
+
+    assert [call[:-1] for call in calls] == [
+        ("press", "a"),
+        ("move", 10, 20),
+        ("click", 10, 20, "left", True),
+    ]
+    assert all(isinstance(call[-1], float) for call in calls)
+    assert calls[0][-1] <= calls[1][-1] <= calls[2][-1]
+
+
+def test_callbacks_still_work_without_the_injected_flag():
+    queue = SPSCQueue("keyboard", 4)
+    queue.hook(lambda key, at=None: None, KEY_ARITY)("a")
+    ((at, handler, args),) = queue.drain()
+    assert args == ("a",)
+
+
+def test_full_queue_drops_and_counts():
+    queue = SPSCQueue("mouse", 2)
+    callback = queue.hook(lambda x, y, at=None: None, MOVE_ARITY)
+    for i in range(5):
+        callback(i, i, False)
+    assert queue.dropped == 3
+    assert [args for _, _, args in queue.drain()] == [(0, 0), (1, 1)]
+
+
+def test_slow_handlers_count_as_overruns(monkeypatch):
+    monkeypatch.setattr(hookqueue, "callback_budget", 0.002)
+    consumer = HookConsumer(64)
+    keyboard = consumer.add_queue("keyboard")
+    done = threading.Event()
+
+    def slow(key, at=None):
+        time.sleep(0.02)
+
+    fast = keyboard.hook(lambda key, at=None: None, KEY_ARITY)
+    fast("a")
+    slow_callback = keyboard.hook(slow, KEY_ARITY)
+    slow_callback("b")
+    slow_callback("c")
+    # Runs after both slow handlers were timed
+    keyboard.hook(lambda key, at=None: done.set(), KEY_ARITY)("d")
+    assert done.wait(2.0)
+
+    stats = consumer.stats()["keyboard"]
+    assert stats["overruns"] == 2
+    assert stats["handled"] >= 3
+    assert stats["max_overrun_ms"] >= 20
@@ -0,0 +1,111 @@
+import pytest
+
+import input_control
+import macros
+from input_control import (
+    MOUSEEVENTF_LEFTDOWN,
+    MOUSEEVENTF_LEFTUP,
+    VK_E,
+    VK_TAB,
+    RecordingSendInput,
+    Win32Backend,
+)
+
+
+@pytest.fixture
+def recorder():
+    recorder = RecordingSendInput()
+    previous = input_control.set_send_input(recorder)
+    yield recorder
+    input_control.set_send_input(previous)
+
+
+@pytest.fixture
+def win32(recorder):
+    backend = Win32Backend()
+    previous = input_control.set_backend(backend)
+    yield backend
+    input_control.set_backend(previous)
+
+
+def test_group_is_one_sendinput(win32, recorder):
+    group = win32.prepare_group(
+        [
+            ("key_press", f"vk:{VK_TAB}", None, None),
+            ("key_press", f"vk:{VK_E}", None, None),
+            ("mouse_press", "left", None, None),
+        ]
+    )
+    win32.send_group(group)
+
+    assert len(recorder.calls) == 1
+    assert recorder.events() == [
+        ("key", VK_TAB, False),
+        ("key", VK_E, False),
+        ("mouse", MOUSEEVENTF_LEFTDOWN, 0, 0),
+    ]
+
+
+def test_prepared_group_is_reusable(win32, recorder):
+    group = win32.prepare_group([("key_release", f"vk:{VK_E}", None, None)])
+    win32.send_group(group)
+    win32.send_group(group)
+
+    assert [events for _, events in recorder.calls] == [[("key", VK_E, True)]] * 2
+
+
+def test_cancel_releases_held_inputs_in_one_call(win32, recorder):
+    held = {("vk", VK_TAB), ("button", "left"), ("burst", ("vk", VK_E))}
+    macros._cancel_cleanup(held, [], {})
+
+    assert len(recorder.calls) == 1
+    assert sorted(recorder.events()) == sorted(
+        [
+            ("key", VK_TAB, True),
+            ("key", VK_E, True),
+            ("mouse", MOUSEEVENTF_LEFTUP, 0, 0),
+        ]
+    )
+
+
+def test_key_input_carries_scan_code(monkeypatch):
+    scan_codes = {VK_E: 0x12, 0x25: 0x4B}
+    monkeypatch.setattr(
+        input_control, "MapVirtualKeyW", lambda vk, mode: scan_codes.get(vk, 0)
+    )
+
+    e_up = input_control.key_input(VK_E, up=True).ii.ki
+    assert (e_up.wVk, e_up.wScan) == (VK_E, 0x12)
+    assert e_up.dwFlags == input_control.KEYEVENTF_KEYUP
+
+    left = input_control.key_input(0x25).ii.ki
+    assert left.wScan == 0x4B
+    assert left.dwFlags == input_control.KEYEVENTF_EXTENDEDKEY
+
+
+def test_win32_char_lookup_passes_the_whole_character(monkeypatch):
+    scanned = []
+    layout = {"e": 0x45, "\u20ac": 0x645}
+
+    def vk_key_scan(char):
+        scanned.append(char)
+        return layout.get(char, -1)
+
+    monkeypatch.setattr(input_control, "VkKeyScanW", vk_key_scan)
+    backend = Win32Backend()
+    assert backend._resolve_vk("char:e") == 0x45
+    # Euro sign needs AltGr, unmapped CJK: both go through the fallback
+    assert backend._resolve_vk("char:\u20ac") == -1
+    assert backend._resolve_vk("char:\u4e2d") == -1
+    assert scanned == ["e", "\u20ac", "\u4e2d"]
+
+
+def test_set_backend_swaps_the_dispatch_object():
+    memory = input_control.MemoryBackend(clock=lambda: 0.0)
+    previous = input_control.set_backend(memory)
+    try:
+        macros._cancel_cleanup({("key", "char:e")}, [], {})
+    finally:
+        assert input_control.set_backend(previous) is memory
+
+    assert memory.events == [(0.0, "key_release", "char:e")]
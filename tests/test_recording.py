@@ -0,0 +1,126 @@
+import os
+import threading
+
+import pytest
+
+import hotkeys
+import recording
+from recording_catalog import RecordingCatalog
+from recording_store import EVENT_TYPES
+from simulation import simulation_state
+
+
+@pytest.fixture
+def recordings_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(recording, "RECORDINGS_DIR", str(tmp_path))
+    monkeypatch.setattr(
+        recording,
+        "_catalog",
+        RecordingCatalog(
+            str(tmp_path), recording.read_recording, recording.RECORDING_EXTENSIONS
+        ),
+    )
+    return tmp_path
+
+
+def _record_some(state):
+    recording.start_recording(state, lambda: None)
+    recording.record_action(state, "key_press", key="char:e")
+    recording.record_action(state, "key_release", key="char:e")
+    recording.record_action(state, "mouse_move", x=10, y=20)
+
+
+@pytest.fixture
+def release(monkeypatch):
+    """Holds the background conversion until set"""
+    release = threading.Event()
+    convert = recording.finish_recording_file
+
+    def slow_finish(filename, config=None):
+        assert release.wait(5.0)
+        return convert(filename, config)
+
+    monkeypatch.setattr(recording, "finish_recording_file", slow_finish)
+    return release
+
+
+def test_stop_does_not_wait_for_the_conversion(recordings_dir, release):
+    state = simulation_state()
+    _record_some(state)
+
+    finisher = recording.stop_recording(state, lambda: None)
+    # Stopped while the conversion is still blocked; the CSV is selected meanwhile
+    assert not state["is_recording"]
+    assert state["last_recording_file"].endswith(".csv")
+    assert len(recording.ensure_recording_loaded(state)) == 3
+    # The GUI rescans the folder meanwhile and lists the CSV
+    catalog = recording.get_recording_catalog()
+    catalog.refresh()
+
+    release.set()
+    finisher.join(5.0)
+    assert state["last_recording_file"].endswith(".mrec")
+    assert len(state["recorded_actions"]) == 3
+    name = os.path.basename(state["last_recording_file"])
+    assert sorted(os.listdir(recordings_dir)) == ["catalog.json", name]
+    assert [entry["name"] for entry in catalog.recordings()] == [name]
+
+
+def test_conversion_does_not_replace_a_newer_selection(recordings_dir, release):
+    state = simulation_state()
+    _record_some(state)
+    finisher = recording.stop_recording(state, lambda: None)
+    other = str(recordings_dir / "other.mrec")
+    recording.select_recording(state, other)
+
+    release.set()
+    finisher.join(5.0)
+    assert state["last_recording_file"] == other
+    assert not state["recorded_actions"]
+    assert any(name.endswith(".mrec") for name in os.listdir(recordings_dir))
+
+
+def test_preload_leaves_a_recording_in_progress_alone(recordings_dir):
+    state = simulation_state()
+    _record_some(state)
+    older = recording.Recording()
+    older.append(0.0, 0, "char:q")
+    recording.write_binary(
+        older, str(recordings_dir / "recording_20200101_000000.mrec")
+    )
+    partial = state["recording_writer"].partial
+
+    recording.preload_recording(state).join(5.0)
+    assert os.path.exists(partial)
+    assert state["last_recording_file"] is None
+
+    recording.stop_recording(state, lambda: None).join(5.0)
+    assert len(state["recorded_actions"]) == 3
+
+
+def test_recorded_times_stay_monotonic_around_buffered_moves(recordings_dir):
+    state = simulation_state()
+    recording.start_recording(state, lambda: None)
+    start = state["recording_start_time"]
+
+    def record_action(action_type, **kwargs):
+        recording.record_action(state, action_type, **kwargs)
+
+    # The second move stays in the sampler until the key event flushes it
+    hotkeys.on_mouse_move(0, 0, state, record_action, at=start)
+    hotkeys.on_mouse_move(40, 0, state, record_action, at=start + 0.040)
+    hotkeys.on_key_press("char:q", state, *[None] * 6, record_action, at=start + 0.045)
+    hotkeys.on_mouse_move(80, 0, state, record_action, at=start + 0.050)
+    hotkeys.on_key_release("char:q", state, record_action, at=start + 0.060)
+
+    recording.stop_recording(state, lambda: None).join(5.0)
+    recorded = recording.ensure_recording_loaded(state)
+    events = [EVENT_TYPES[code] for code in recorded.types]
+    assert events == [
+        "mouse_move",
+        "mouse_move",
+        "key_press",
+        "mouse_move",
+        "key_release",
+    ]
+    assert list(recorded.times) == sorted(recorded.times)
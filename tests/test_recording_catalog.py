@@ -0,0 +1,83 @@
+import os
+
+from recording_catalog import RecordingCatalog, entry_label, summarize
+from recording_format import read_binary, write_binary
+from recording_store import KEY_PRESS, Recording
+
+
+def _write(folder, name, key="char:e"):
+    recording = Recording()
+    recording.append(0.0, KEY_PRESS, key)
+    path = os.path.join(folder, name)
+    write_binary(recording, path)
+    return path
+
+
+def _catalog(folder):
+    return RecordingCatalog(str(folder), read_binary, (".mrec",))
+
+
+def test_latest_is_the_newest_recording_not_the_newest_mtime(tmp_path):
+    older = _write(tmp_path, "recording_20260101_120000.mrec")
+    newer = _write(tmp_path, "recording_20260102_120000.mrec")
+    os.utime(newer, (1_000_000, 1_000_000))
+    os.utime(older, (2_000_000_000, 2_000_000_000))  # copied or touched later
+
+    catalog = _catalog(tmp_path)
+    catalog.refresh()
+    assert catalog.latest() == newer
+
+
+def test_unstamped_names_keep_their_first_cataloged_time(tmp_path):
+    first = _write(tmp_path, "first.mrec")
+    os.utime(first, (1_000_000, 1_000_000))
+    second = _write(tmp_path, "second.mrec")
+    os.utime(second, (2_000_000, 2_000_000))
+    catalog = _catalog(tmp_path)
+    catalog.refresh()
+
+    os.utime(first, (3_000_000, 3_000_000))
+    catalog.refresh()
+    assert catalog.latest() == second
+    # Survives a reload from catalog.json
+    reloaded = _catalog(tmp_path)
+    reloaded.refresh()
+    assert reloaded.latest() == second
+
+
+def test_refresh_if_changed_rescans_only_when_the_folder_changed(tmp_path):
+    _write(tmp_path, "recording_20260101_120000.mrec")
+    catalog = _catalog(tmp_path)
+    catalog.refresh()
+    version = catalog.version
+    assert catalog.refresh_if_changed() == 0
+
+    added = _write(tmp_path, "recording_20260102_120000.mrec")
+    # Coarse filesystem clocks may not have moved yet
+    os.utime(tmp_path, (1_000_000, 1_000_000))
+    assert catalog.refresh_if_changed() == 1
+    assert catalog.version == version + 1
+    assert catalog.latest() == added
+
+
+def test_a_converted_recording_replaces_its_source(tmp_path):
+    catalog = _catalog(tmp_path)
+    source = _write(tmp_path, "recording_20260101_120000.mrec")
+    catalog.refresh()
+
+    converted = _write(tmp_path, "recording_20260101_120000_converted.mrec")
+    os.remove(source)
+    catalog.update(converted, replaces=source)
+    assert [entry["name"] for entry in catalog.recordings()] == [
+        os.path.basename(converted)
+    ]
+
+
+def test_key_presses_without_a_key_are_not_counted():
+    recording = Recording()
+    recording.append(0.0, KEY_PRESS, None)
+    recording.append(0.1, KEY_PRESS, "char:e")
+    summary = summarize(recording)
+
+    assert summary["keys"] == {"char:e": 1}
+    entry_label({"name": "x.mrec", **summary})
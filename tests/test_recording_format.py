@@ -0,0 +1,80 @@
+import zlib
+
+import pytest
+
+from recording_format import (
+    HEADER,
+    MAGIC,
+    RecordingFormatError,
+    encode_recording,
+    read_binary,
+    write_binary,
+)
+from recording_store import KEY_PRESS, KEY_RELEASE, MOUSE_MOVE, MOUSE_PRESS, Recording
+
+# Ctrl+J arrives as "\n", Ctrl+M as "\r"; pynput passes other control chars as-is
+CONTROL_SYMBOLS = ["char:\n", "char:\r", "char:\t", "char:\x00", "char:\x7f", "char:ü"]
+
+
+def _recording(symbols):
+    recording = Recording()
+    at = 0.0
+    for symbol in symbols:
+        recording.append(at, KEY_PRESS, symbol)
+        recording.append(at + 0.01, KEY_RELEASE, symbol)
+        at += 0.02
+    recording.append(at, MOUSE_MOVE, None, 640, 360)
+    recording.append(at + 0.001, MOUSE_PRESS, "left", 640, 360)
+    return recording
+
+
+def _events(recording):
+    return [
+        (event.type, event.key, event.button, event.x, event.y) for event in recording
+    ]
+
+
+def test_round_trip_with_control_character_symbols(tmp_path):
+    original = _recording(["char:e"] + CONTROL_SYMBOLS + ["Key.f5", "vk:219"])
+    path = str(tmp_path / "controls.mrec")
+    write_binary(original, path)
+
+    loaded = read_binary(path)
+    assert loaded.symbols == original.symbols
+    assert _events(loaded) == _events(original)
+    assert list(loaded.times) == pytest.approx(list(original.times), abs=1e-6)
+
+
+def test_version_1_files_still_load(tmp_path):
+    recording = _recording(["char:e", "Key.tab"])
+    data = encode_recording(recording)
+    symbols_size = HEADER.unpack_from(data)[6]
+    columns = data[HEADER.size + symbols_size :]
+    body = "\n".join(recording.symbols[1:]).encode("utf-8") + columns
+    header = HEADER.pack(
+        MAGIC,
+        1,
+        0,
+        len(recording),
+        recording.duration(),
+        zlib.crc32(body),
+        len(body) - len(columns),
+        0,
+    )
+    path = tmp_path / "old.mrec"
+    path.write_bytes(header + body)
+
+    assert read_binary(str(path)).symbols == recording.symbols
+
+
+def test_truncated_symbol_table_is_rejected(tmp_path):
+    data = bytearray(encode_recording(_recording(["char:e"])))
+    data[HEADER.size] = 0xFF  # first symbol claims to run past the table
+    body = bytes(data[HEADER.size :])
+    fields = list(HEADER.unpack_from(data))
+    fields[5] = zlib.crc32(body)
+    path = tmp_path / "broken.mrec"
+    path.write_bytes(HEADER.pack(*fields) + body)
+
+    with pytest.raises(RecordingFormatError):
+        read_binary(str(path))
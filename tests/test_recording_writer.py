@@ -0,0 +1,29 @@
+import os
+
+from recording_writer import RecordingWriter, recover_partial_recordings
+
+ROW = (0.0, "key_press", "char:e", "", "", "")
+
+
+def test_recovery_skips_a_live_recording(tmp_path):
+    writer = RecordingWriter(str(tmp_path / "live.csv"), flush_rows=1)
+    writer.append(ROW)
+
+    assert recover_partial_recordings(str(tmp_path)) == []
+    assert os.path.exists(writer.partial)
+
+    writer.append(ROW)
+    assert writer.close() == str(tmp_path / "live.csv")
+    with open(writer.filename, encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 3
+
+
+def test_recovery_finishes_a_crashed_recording(tmp_path):
+    partial = tmp_path / "crashed.csv.part"
+    partial.write_bytes(
+        b"time,type,key,button,x,y\r\n0.0,key_press,char:e,,,\r\n0.1,key_re"
+    )
+
+    assert recover_partial_recordings(str(tmp_path)) == [str(tmp_path / "crashed.csv")]
+    assert not partial.exists()
+    assert (tmp_path / "crashed.csv").read_bytes().endswith(b"char:e,,,\r\n")
@@ -0,0 +1,38 @@
+import macros
+from simulation import simulate_throw, simulate_throw_v2, simulate_timeline
+
+
+def _presses(trace, value):
+    return [
+        at for at, action_type, v in trace if action_type == "key_press" and v == value
+    ]
+
+
+def test_config_overrides_change_the_throw_timeline():
+    long_spam = simulate_throw({"throw_spam_duration": 1.0})
+    short_spam = simulate_throw({"throw_spam_duration": 0.2})
+
+    long_e = _presses(long_spam, "char:e")
+    short_e = _presses(short_spam, "char:e")
+    assert len(long_e) > len(short_e)
+    assert long_e[-1] - short_e[-1] > 0.7
+
+
+def test_throw_v2_follows_overrides_after_a_cached_plan():
+    simulate_throw_v2()
+    slow = simulate_throw_v2({"throw_drag_time": 1.0})
+    fast = simulate_throw_v2({"throw_drag_time": 0.1})
+
+    assert slow[-1][0] - fast[-1][0] > 0.8
+
+
+def test_get_plan_recompiles_for_a_different_config():
+    first = macros.get_plan("throw", {"throw_e_period": 0.02})
+    assert macros.get_plan("throw", {"throw_e_period": 0.02}) is first
+    other = macros.get_plan("throw", {"throw_e_period": 0.05})
+    assert other is not first
+    assert other.signature != first.signature
+
+
+def test_simulation_is_deterministic():
+    assert simulate_timeline() == simulate_timeline()
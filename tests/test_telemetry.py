@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+import input_control
+import macros
+import recording
+import telemetry
+import timing
+from simulation import simulation_state
+
+
+@pytest.fixture
+def virtual_run(monkeypatch):
+    """Virtual clock and memory backend, telemetry on (simulate() turns it off)"""
+    clock = timing.VirtualClock()
+    monkeypatch.setattr(telemetry, "enabled", True)
+    previous_clock = timing.set_clock(clock)
+    previous_backend = input_control.set_backend(
+        input_control.MemoryBackend(clock.perf_counter)
+    )
+    yield
+    input_control.set_backend(previous_backend)
+    timing.set_clock(previous_clock)
+
+
+def _triggered(macro, run):
+    version = telemetry.latency_version
+    telemetry.arm_trigger(macro, time.perf_counter())
+    run()
+    return telemetry.latency_version - version
+
+
+def test_throw_v1_publishes_its_latency(virtual_run):
+    sim_state = simulation_state()
+    assert _triggered("throw", lambda: macros.run_throw_macro(sim_state)) == 1
+    assert telemetry.last_latency[0] == "throw"
+
+
+def test_playback_publishes_its_latency(virtual_run):
+    sim_state = simulation_state(
+        recorded_actions=[
+            {"time": 0.0, "type": "key_press", "key": "char:e"},
+            {"time": 0.05, "type": "key_release", "key": "char:e"},
+        ]
+    )
+    assert _triggered("playback", lambda: recording.playback_recording(sim_state)) == 1
+    assert telemetry.last_latency[0] == "playback"
+
+
+def test_only_the_first_input_counts():
+    telemetry.arm_trigger("macro", time.perf_counter())
+    version = telemetry.latency_version
+    telemetry.mark_first_input()
+    telemetry.mark_first_input()
+    assert telemetry.latency_version == version + 1
@@ -0,0 +1,43 @@
+import pytest
+
+import timing
+from timing import PeriodicBurst, Timeline, VirtualClock, merge_lanes, run_heap
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock()
+    previous = timing.set_clock(clock)
+    yield clock
+    timing.set_clock(previous)
+
+
+def _run_stalled_burst(clock, catch_up):
+    """10 bursts/s for 1 s on the heap, with a 330 ms stall after the second"""
+    presses = []
+    timeline = Timeline(0.0)
+    burst = PeriodicBurst(10, 0.5, 1.0, catch_up)
+    lane, stats = burst.events(
+        0.0, lambda: presses.append(clock.now), lambda: None, timeline, "click"
+    )
+    stall = [(0.15, "stall", lambda: clock.sleep(0.33), False)]
+    run_heap(merge_lanes(stall, lane), timeline)
+    return presses, stats
+
+
+def test_heap_bursts_skip_missed_slots(clock):
+    presses, stats = _run_stalled_burst(clock, "skip")
+    assert presses == pytest.approx([0.0, 0.1, 0.5, 0.6, 0.7, 0.8, 0.9])
+    assert (stats.fired, stats.skipped) == (7, 3)
+
+
+def test_heap_bursts_fire_missed_slots_back_to_back(clock):
+    presses, stats = _run_stalled_burst(clock, "burst")
+    assert presses[2:5] == pytest.approx([0.48, 0.48, 0.48])
+    assert (stats.fired, stats.skipped) == (10, 0)
+
+
+def test_heap_bursts_shift_the_grid(clock):
+    presses, stats = _run_stalled_burst(clock, "shift")
+    assert presses == pytest.approx([0.0, 0.1, 0.48, 0.58, 0.68, 0.78, 0.88, 0.98])
+    assert (stats.fired, stats.skipped) == (8, 0)
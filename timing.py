@@ -0,0 +1,546 @@
+import heapq
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+import telemetry
+
+_real_perf_counter = time.perf_counter
+
+DEFAULT_SPIN_THRESHOLD = 0.002
+MIN_SPIN_THRESHOLD = 0.0005
+MAX_SPIN_THRESHOLD = 0.02
+
+spin_threshold = DEFAULT_SPIN_THRESHOLD
+
+
+class MacroCancelled(Exception):
+    """Raised by a wait when the running macro's cancel token fires"""
+
+
+class CancelToken(threading.Event):
+    """Set to cancel a macro; every wait_until on its thread checks it"""
+
+    cancel = threading.Event.set
+    cancelled = threading.Event.is_set
+
+
+# Never set, used for coarse sleeps on threads without a cancel token
+_no_token = CancelToken()
+_local = threading.local()
+
+
+def set_cancel_token(token):
+    """Install the cancel token that wait_until checks on the current thread"""
+    _local.token = token
+
+
+def get_cancel_token():
+    return getattr(_local, "token", None)
+
+
+def calibrate_spin_threshold(samples=25, request=0.001):
+    """
+    Measure how far a timed wait overshoots on this machine and use the worst
+    case (plus margin) as the distance from a deadline at which wait_until
+    stops sleeping and starts spinning.
+    """
+    global spin_threshold
+    worst = 0.0
+    for _ in range(samples):
+        before = _real_perf_counter()
+        _no_token.wait(request)
+        worst = max(worst, _real_perf_counter() - before - request)
+    spin_threshold = min(
+        MAX_SPIN_THRESHOLD, max(MIN_SPIN_THRESHOLD, worst * 1.25 + request)
+    )
+    print(f">> TIMING: Spin threshold calibrated to {spin_threshold * 1000:.2f} ms")
+    return spin_threshold
+
+
+class StartupTimer:
+    """Timestamped startup breakdown: every mark() logs the time since start"""
+
+    def __init__(self, start=None):
+        self.start = _real_perf_counter() if start is None else start
+        self.last = self.start
+        self.marks = []
+
+    def mark(self, label, since=None):
+        """
+        Log label with the time since start and since the previous mark; work
+        that ran on another thread passes its own start as since
+        """
+        now = _real_perf_counter()
+        step = now - (self.last if since is None else since)
+        if since is None:
+            self.last = now
+        self.marks.append((label, now - self.start, step))
+        print(
+            f">> STARTUP: {(now - self.start) * 1000:8.1f} ms  {label} "
+            f"({step * 1000:.1f} ms)"
+        )
+
+
+class RealClock:
+    """The machine clock: perf_counter, wall time and calibrated waits"""
+
+    simulated = False
+
+    perf_counter = staticmethod(_real_perf_counter)
+    sleep = staticmethod(time.sleep)
+    time = staticmethod(time.time)
+
+    def wait_until(self, deadline):
+        token = getattr(_local, "token", None) or _no_token
+        remaining = deadline - _real_perf_counter()
+        if remaining > spin_threshold and token.wait(remaining - spin_threshold):
+            raise MacroCancelled()
+        now = _real_perf_counter()
+        while now < deadline:
+            time.sleep(0)
+            now = _real_perf_counter()
+        if token.cancelled():
+            raise MacroCancelled()
+        return now - deadline
+
+
+class VirtualClock:
+    """
+    Simulated clock: sleeps and waits return immediately and advance a
+    virtual now, so a multi-second macro runs in microseconds. Deadlines are
+    always hit exactly. events collects the trace (the memory backend and
+    network toggles log into it).
+    """
+
+    simulated = True
+
+    def __init__(self, start=0.0, epoch=0.0):
+        self.now = start
+        self.epoch = epoch
+        self.events = []
+
+    def perf_counter(self):
+        return self.now
+
+    def time(self):
+        return self.epoch + self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+    def wait_until(self, deadline):
+        if deadline > self.now:
+            self.now = deadline
+        token = getattr(_local, "token", None)
+        if token is not None and token.cancelled():
+            raise MacroCancelled()
+        return 0.0
+
+    def log(self, action_type, value):
+        self.events.append((self.now, action_type, value))
+
+    @contextmanager
+    def detached(self):
+        """Run a side action in parallel virtual time: now is restored afterwards"""
+        now = self.now
+        try:
+            yield
+        finally:
+            self.now = now
+
+
+_clock = RealClock()
+
+
+def set_clock(new_clock):
+    """Switch every macro/playback/network wait to new_clock, returns the previous clock"""
+    global _clock
+    previous, _clock = _clock, new_clock
+    return previous
+
+
+def get_clock():
+    return _clock
+
+
+def perf_counter():
+    """Monotonic seconds on the active clock"""
+    return _clock.perf_counter()
+
+
+def wall_time():
+    """Epoch seconds on the active clock"""
+    return _clock.time()
+
+
+def sleep(seconds):
+    """Plain relative sleep on the active clock (not cancellable)"""
+    _clock.sleep(seconds)
+
+
+def wait_until(deadline):
+    """
+    Wait for an absolute perf_counter deadline: coarse sleep until the spin
+    threshold, then yield-spin the rest. Returns how late we woke up (seconds).
+    Raises MacroCancelled if the thread's cancel token fires.
+    """
+    return _clock.wait_until(deadline)
+
+
+class Timeline:
+    """
+    Absolute deadlines measured from a macro start, with per-deadline misses.
+    With a macro name, every deadline and blocking step is also recorded as
+    planned-vs-actual telemetry.
+    """
+
+    def __init__(self, start=None, macro=None):
+        self.start = perf_counter() if start is None else start
+        self.origin = self.start
+        self.misses = []
+        self.slips = []
+        self.macro = macro
+        self.run = telemetry.new_run() if macro else None
+
+    def at(self, offset, label=""):
+        """Wait until start + offset and record the miss, returns the miss in seconds"""
+        miss = wait_until(self.start + offset)
+        self.misses.append((label, offset, miss))
+        if self.run is not None:
+            telemetry.record(
+                self.run,
+                self.macro,
+                label,
+                offset,
+                self.start + offset + miss - self.origin,
+                miss,
+            )
+        return miss
+
+    def slip(self, offset, label=""):
+        """
+        Call after a blocking step of unknown length (network toggle) that was
+        planned to end at start + offset: if it overran, later deadlines move
+        by the overrun instead of all firing late. Returns the overrun.
+        """
+        overrun = perf_counter() - (self.start + offset)
+        if self.run is not None:
+            telemetry.record(
+                self.run,
+                self.macro,
+                f"{label} call",
+                offset,
+                self.start + offset + overrun - self.origin,
+                overrun,
+            )
+        if overrun <= 0:
+            return 0.0
+        self.start += overrun
+        self.slips.append((label, offset, overrun))
+        return overrun
+
+    def elapsed(self):
+        """Time since the (slipped) start that deadlines are measured from"""
+        return perf_counter() - self.start
+
+    def total(self):
+        """Wall time since the timeline was created, including slips"""
+        return perf_counter() - self.origin
+
+    def max_miss(self):
+        return max((miss for _, _, miss in self.misses), default=0.0)
+
+    def summary(self):
+        """Short text for the macro completion log"""
+        text = f"{len(self.misses)} deadlines, max miss {self.max_miss() * 1000:.2f} ms"
+        if self.slips:
+            slipped = sum(overrun for _, _, overrun in self.slips)
+            text += f", {slipped * 1000:.1f} ms slipped on blocking steps"
+        return text
+
+
+CATCH_UP_POLICIES = ("skip", "burst", "shift")
+
+
+class BurstStats:
+    """Achieved rate and jitter of one PeriodicBurst run"""
+
+    def __init__(self, target_rate):
+        self.target_rate = target_rate
+        self.fired = 0
+        self.skipped = 0
+        self.first = None
+        self.last = None
+        self.lateness = []
+
+    def add(self, fired_at, lateness):
+        if self.first is None:
+            self.first = fired_at
+        self.last = fired_at
+        self.fired += 1
+        self.lateness.append(lateness)
+
+    def achieved_rate(self):
+        if self.fired < 2 or self.last <= self.first:
+            return 0.0
+        return (self.fired - 1) / (self.last - self.first)
+
+    def jitter(self):
+        """Standard deviation of the per-burst lateness (seconds)"""
+        if not self.lateness:
+            return 0.0
+        mean = sum(self.lateness) / len(self.lateness)
+        return math.sqrt(
+            sum((late - mean) ** 2 for late in self.lateness) / len(self.lateness)
+        )
+
+    def summary(self):
+        return (
+            f"{self.fired} bursts at {self.achieved_rate():.2f}/s "
+            f"(target {self.target_rate:.2f}/s), jitter {self.jitter() * 1000:.2f} ms, "
+            f"{self.skipped} skipped"
+        )
+
+
+# Upper bucket edges of the lateness histogram (ms), the last bucket is open
+LATENESS_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+class LatenessHistogram:
+    """How late each scheduled group went out, bucketed by LATENESS_BUCKETS_MS"""
+
+    def __init__(self, edges=LATENESS_BUCKETS_MS):
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, lateness):
+        """lateness in seconds (negative counts as on time)"""
+        lateness_ms = max(0.0, lateness * 1000)
+        bucket = 0
+        for edge in self.edges:
+            if lateness_ms < edge:
+                break
+            bucket += 1
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += lateness_ms
+        if lateness_ms > self.worst:
+            self.worst = lateness_ms
+
+    def percentile(self, pct):
+        """Upper bucket edge (ms) below which pct percent of the groups fell"""
+        if not self.count:
+            return 0.0
+        target = pct / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                if bucket < len(self.edges):
+                    return min(self.edges[bucket], self.worst)
+                return self.worst
+        return self.worst
+
+    def rows(self):
+        """(label, count) per bucket"""
+        labels = [f"< {edge:g} ms" for edge in self.edges]
+        labels.append(f">= {self.edges[-1]:g} ms")
+        return list(zip(labels, self.counts))
+
+    def summary(self):
+        if not self.count:
+            return "no groups"
+        return (
+            f"{self.count} groups, mean {self.total / self.count:.3f} ms late, "
+            f"p99 <= {self.percentile(99):g} ms, max {self.worst:.3f} ms"
+        )
+
+
+class PeriodicBurst:
+    """
+    Down/up bursts at a target rate and duty cycle for a total duration, on
+    absolute deadlines. catch_up decides what happens to slots that are
+    already past when the loop gets to them: "skip" drops them and stays on
+    the grid, "burst" fires them back to back, "shift" restarts the grid now.
+    """
+
+    def __init__(self, rate, duty=0.5, duration=1.0, catch_up="skip"):
+        if rate <= 0:
+            raise ValueError("Burst rate must be positive")
+        if not 0.0 < duty < 1.0:
+            raise ValueError("Duty cycle must be between 0 and 1")
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy: {catch_up}")
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.hold = self.period * duty
+        self.duration = duration
+        self.catch_up = catch_up
+
+    def __repr__(self):
+        return (
+            f"PeriodicBurst(rate={self.rate:.2f}/s, hold={self.hold * 1000:.1f} ms, "
+            f"duration={self.duration:.3f}s, catch_up={self.catch_up})"
+        )
+
+    @classmethod
+    def from_dwell(cls, dwell, gap, duration, catch_up="skip"):
+        """Burst from a hold time and the pause after each release"""
+        period = dwell + gap
+        return cls(1.0 / period, dwell / period, duration, catch_up)
+
+    def run(self, timeline, offset, down, up, after=None, label="burst"):
+        """
+        Fire bursts on timeline from offset for the configured duration.
+        after(slot) runs after each release. Returns BurstStats.
+        """
+        stats = BurstStats(self.rate)
+        period = self.period
+        up_label = f"{label} up"
+        end = offset + self.duration
+        slot = offset
+        while slot < end:
+            lateness = timeline.at(slot, label)
+            down()
+            stats.add(timeline.start + slot + lateness, lateness)
+            timeline.at(slot + self.hold, up_label)
+            up()
+            if after is not None:
+                after(slot)
+
+            slot += period
+            behind = timeline.elapsed() - slot
+            if behind > 0:
+                if self.catch_up == "skip":
+                    missed = math.ceil(behind / period)
+                    slot += missed * period
+                    stats.skipped += missed
+                elif self.catch_up == "shift":
+                    slot += behind
+        return stats
+
+    def events(self, offset, down, up, timeline, label="burst"):
+        """
+        The bursts as a lane of (offset, label, action, blocking) events for
+        run_heap, returns (events, stats). Only the first press is planned up
+        front: each press hands run_heap its release and each release the
+        next press, placed by catch_up like in run(). stats fills in as the
+        lane runs.
+        """
+        stats = BurstStats(self.rate)
+        period = self.period
+        up_label = f"{label} up"
+        end = offset + self.duration
+
+        def press(grid, k):
+            # Slot k of a grid that starts at grid (moved by "shift")
+            slot = grid + k * period
+
+            def action():
+                lateness = timeline.elapsed() - slot
+                down()
+                stats.add(timeline.start + slot + lateness, lateness)
+                return (slot + self.hold, up_label, release(grid, k), False)
+
+            return action
+
+        def release(grid, k):
+            def action():
+                up()
+                next_grid, next_k = grid, k + 1
+                behind = timeline.elapsed() - (next_grid + next_k * period)
+                if behind > 0:
+                    if self.catch_up == "skip":
+                        missed = math.ceil(behind / period)
+                        next_k += missed
+                        stats.skipped += missed
+                    elif self.catch_up == "shift":
+                        next_grid += behind
+                slot = next_grid + next_k * period
+                if slot < end:
+                    return (slot, label, press(next_grid, next_k), False)
+                return None
+
+            return action
+
+        return [(offset, label, press(offset, 0), False)], stats
+
+
+_side_executor = None
+
+
+class _DetachedExecutor:
+    """Side executor for a VirtualClock: runs actions inline in parallel virtual time"""
+
+    def submit(self, action):
+        future = Future()
+        with _clock.detached():
+            try:
+                future.set_result(action())
+            except Exception as e:
+                future.set_exception(e)
+        return future
+
+
+def get_side_executor():
+    """Long-lived single worker for blocking timeline actions (network toggles)"""
+    global _side_executor
+    if _clock.simulated:
+        return _DetachedExecutor()
+    if _side_executor is None:
+        _side_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="macro-side"
+        )
+    return _side_executor
+
+
+def merge_lanes(*lanes):
+    """
+    Merge lanes of (offset, label, action, blocking) events into one heap
+    ordered by offset; ties keep lane order.
+    """
+    heap = []
+    for lane in lanes:
+        for offset, label, action, blocking in lane:
+            heap.append((offset, len(heap), label, action, blocking))
+    heapq.heapify(heap)
+    return heap
+
+
+def run_heap(heap, timeline, side_executor=None):
+    """
+    Execute a merged event heap from the calling thread on absolute deadlines.
+    Blocking actions are handed to the side executor so they never delay the
+    events behind them; waits for those to finish before returning. A
+    non-blocking action may return its lane's next event, which is pushed
+    onto the heap (PeriodicBurst.events() plans its slots that way).
+    """
+    if side_executor is None:
+        side_executor = get_side_executor()
+    pending = []
+    sequence = len(heap)
+    try:
+        while heap:
+            offset, _, label, action, blocking = heapq.heappop(heap)
+            timeline.at(offset, label)
+            if blocking:
+                pending.append((label, side_executor.submit(action)))
+                continue
+            follow_up = action()
+            if follow_up is not None:
+                offset, label, action, blocking = follow_up
+                heapq.heappush(heap, (offset, sequence, label, action, blocking))
+                sequence += 1
+    finally:
+        # Also on cancel, so cleanup never races an in-flight network toggle
+        for label, future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"!! ERROR in timeline action '{label}': {e}")